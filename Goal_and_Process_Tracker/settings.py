@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from django.urls import reverse_lazy
 from my_config import db_settings
@@ -62,15 +63,19 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'tracker.apps.TrackerConfig',
     'accounts.apps.AccountsConfig',
     'tracker_calendar.apps.TrackerCalendarConfig',
     'suggestions.apps.SuggestionsConfig',
     'challenges.apps.ChallengesConfig',
     'tasks.apps.TasksConfig',
+    'jobs.apps.JobsConfig',
+    'metrics.apps.MetricsConfig',
 ]
 
 MIDDLEWARE = [
+    'metrics.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -113,6 +118,28 @@ DATABASES = {
 }
 
 
+# Cache
+# In production set REDIS_URL (e.g. redis://localhost:6379/0), so the cache is shared by all server and worker
+# processes and invalidation of cached teacher-student relations, calendar months and autocomplete results
+# reaches every process. Without it (development, tests) every process keeps its own in-memory cache.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -155,3 +182,8 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('accounts:login')
+
+# Request metrics
+# Query count and timings per url name, reported at /metrics/ and by manage.py request_metrics
+
+REQUEST_METRICS_ENABLED = False
@@ -24,5 +24,6 @@ urlpatterns = [
     path('', include('tracker_calendar.urls')),
     path('', include('tasks.urls')),
     path('', include('challenges.urls')),
-    path('', include('suggestions.urls'))
+    path('', include('suggestions.urls')),
+    path('', include('metrics.urls')),
 ]
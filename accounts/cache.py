@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+from .models import Teacher, Student
+
+RELATIONS_CACHE_TIMEOUT = getattr(settings, 'RELATIONS_CACHE_TIMEOUT', 60 * 60)
+
+
+def student_ids_cache_key(teacher_user_id):
+    return f"accounts:student_ids:{teacher_user_id}"
+
+def student_invitation_ids_cache_key(teacher_user_id):
+    return f"accounts:student_invitation_ids:{teacher_user_id}"
+
+def teacher_invitation_ids_cache_key(student_user_id):
+    return f"accounts:teacher_invitation_ids:{student_user_id}"
+
+def get_cached_user_ids(key, queryset):
+    user_ids = cache.get(key)
+    if user_ids is None:
+        user_ids = frozenset(queryset.values_list('user_id', flat=True))
+        cache.set(key, user_ids, RELATIONS_CACHE_TIMEOUT)
+    return user_ids
+
+def get_student_ids(teacher_user_id):
+    """
+    Return user ids of students of active teacher with given user id.
+    """
+    return get_cached_user_ids(
+        student_ids_cache_key(teacher_user_id),
+        Student.objects.filter(teachers__user_id=teacher_user_id, teachers__is_teacher=True)
+    )
+
+def get_student_invitation_ids(teacher_user_id):
+    """
+    Return user ids of students who invited teacher with given user id.
+    """
+    return get_cached_user_ids(
+        student_invitation_ids_cache_key(teacher_user_id),
+        Student.objects.filter(invitations__user_id=teacher_user_id)
+    )
+
+def get_teacher_invitation_ids(student_user_id):
+    """
+    Return user ids of teachers who invited student with given user id.
+    """
+    return get_cached_user_ids(
+        teacher_invitation_ids_cache_key(student_user_id),
+        Teacher.objects.filter(invitations__user_id=student_user_id)
+    )
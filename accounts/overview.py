@@ -0,0 +1,58 @@
+import datetime
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+from tracker.models import Practice, TaskStats, Challenge, Task
+
+UserModel = get_user_model()
+
+
+def group_by_user(queryset, user_field, **aggregates):
+    """
+    Run one grouped aggregate query and map user ids to aggregated values.
+    """
+    return {
+        row.pop(user_field): row
+        for row in queryset.order_by().values(user_field).annotate(**aggregates)
+    }
+
+def get_students_overview(student_ids, today=None):
+    """
+    Return students with practice minutes of the current week, last practice date,
+    number of open and fulfilled challenges and number of suggested tasks,
+    using one grouped query for each of them across all students.
+    """
+    today = today or timezone.localdate()
+    monday = today - datetime.timedelta(days=today.weekday())
+    students = list(UserModel.objects.filter(pk__in=student_ids).order_by('last_name', 'first_name', 'username'))
+    week = group_by_user(
+        Practice.objects.filter(task__user__in=student_ids, date__range=(monday, monday + datetime.timedelta(days=6))),
+        'task__user',
+        time=Sum('time'),
+        practices=Count('pk'),
+    )
+    last_practice = group_by_user(
+        TaskStats.objects.filter(task__user__in=student_ids),
+        'task__user',
+        date=Max('last_practice_date'),
+    )
+    challenges = group_by_user(
+        Challenge.objects.filter(user__in=student_ids, is_completed=False),
+        'user',
+        open=Count('pk'),
+        fulfilled=Count('pk', filter=Q(are_requirements_fulfilled=True)),
+    )
+    suggested = group_by_user(
+        Task.objects.filter(user__in=student_ids, are_suggestions_enabled=True, is_suggested=True),
+        'user',
+        tasks=Count('pk'),
+    )
+    for student in students:
+        week_time = week.get(student.pk, {}).get('time')
+        student.week_minutes = int(week_time.total_seconds() // 60) if week_time else 0
+        student.week_practices = week.get(student.pk, {}).get('practices', 0)
+        student.last_practice_date = last_practice.get(student.pk, {}).get('date')
+        student.open_challenges = challenges.get(student.pk, {}).get('open', 0)
+        student.fulfilled_challenges = challenges.get(student.pk, {}).get('fulfilled', 0)
+        student.suggested_tasks = suggested.get(student.pk, {}).get('tasks', 0)
+    return students
@@ -1,31 +1,54 @@
 from django.contrib.auth import get_user_model, get_user
+from django.contrib.auth.mixins import UserPassesTestMixin
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+from .cache import get_student_ids
 
 UserModel = get_user_model()
 
+def get_owner(username):
+    return get_object_or_404(UserModel, username=username)
+
+def resolve_owner(owner):
+    return owner if isinstance(owner, UserModel) else get_owner(owner)
+
 def is_owner(user, username):
-    owner = get_object_or_404(UserModel, username=username)
+    owner = resolve_owner(username)
     return user == owner
 
 def is_teacher(user, username):
-    owner = get_object_or_404(UserModel, username=username)
-    if user != owner:
-        if hasattr(user, 'teacher'):
-            if user.teacher.is_teacher:
-                students = user.teacher.students.all()
-                return students.contains(owner.student)
-        return False
+    owner = resolve_owner(username)
+    if user != owner and user.is_authenticated:
+        return owner.pk in get_student_ids(user.pk)
     return False
 
 def is_owner_or_is_teacher(user, username):
-    return is_owner(user, username) or is_teacher(user, username)
+    owner = resolve_owner(username)
+    return is_owner(user, owner) or is_teacher(user, owner)
 
 def is_student(user, username):
-    owner = get_object_or_404(UserModel, username=username)
-    if user != owner:
-        if hasattr(owner, 'student'):
-            if user.teacher.is_teacher:
-                students = user.teacher.students.all()
-                return students.contains(owner.student)
-        return False
+    owner = resolve_owner(username)
+    if user != owner and user.is_authenticated:
+        return owner.pk in get_student_ids(user.pk)
     return False
+
+
+class OwnerPermissionMixin(UserPassesTestMixin):
+    """
+    Resolves owner of the page from username url kwarg once per request
+    and memoizes permission checks on the request.
+    """
+    @cached_property
+    def owner(self):
+        owners = self.request.__dict__.setdefault('owners', {})
+        username = self.kwargs['username']
+        if username not in owners:
+            owners[username] = get_owner(username)
+        return owners[username]
+
+    def has_permission(self, check):
+        results = self.request.__dict__.setdefault('permission_results', {})
+        key = (check.__name__, self.owner.pk)
+        if key not in results:
+            results[key] = check(self.request.user, self.owner)
+        return results[key]
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from .models import Teacher, Student
+from .cache import student_ids_cache_key, student_invitation_ids_cache_key, teacher_invitation_ids_cache_key
+
+
+def get_keyed_user_ids(sender, keyed_model, instance, action, pk_set):
+    """
+    Return user ids of keyed_model side of m2m relation changed by m2m_changed signal.
+    """
+    if isinstance(instance, keyed_model):
+        return [instance.user_id]
+    keyed_field = keyed_model._meta.model_name
+    if action == 'pre_clear':
+        return sender.objects.filter(**{instance._meta.model_name: instance}).values_list(f'{keyed_field}__user_id', flat=True)
+    return keyed_model.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+
+def invalidate_relation(sender, keyed_model, cache_key, instance, action, pk_set):
+    if action in ('post_add', 'post_remove', 'pre_clear'):
+        user_ids = get_keyed_user_ids(sender, keyed_model, instance, action, pk_set)
+        cache.delete_many([cache_key(user_id) for user_id in user_ids])
+
+@receiver(m2m_changed, sender=Teacher.students.through)
+def invalidate_student_ids(sender, instance, action, pk_set, **kwargs):
+    invalidate_relation(sender, Teacher, student_ids_cache_key, instance, action, pk_set)
+
+@receiver(m2m_changed, sender=Student.invitations.through)
+def invalidate_student_invitation_ids(sender, instance, action, pk_set, **kwargs):
+    invalidate_relation(sender, Teacher, student_invitation_ids_cache_key, instance, action, pk_set)
+
+@receiver(m2m_changed, sender=Teacher.invitations.through)
+def invalidate_teacher_invitation_ids(sender, instance, action, pk_set, **kwargs):
+    invalidate_relation(sender, Student, teacher_invitation_ids_cache_key, instance, action, pk_set)
+
+@receiver(post_save, sender=Teacher)
+def invalidate_teacher_student_ids(sender, instance, **kwargs):
+    cache.delete(student_ids_cache_key(instance.user_id))
+
+@receiver(pre_delete, sender=Teacher)
+def invalidate_deleted_teacher(sender, instance, **kwargs):
+    keys = [student_ids_cache_key(instance.user_id), student_invitation_ids_cache_key(instance.user_id)]
+    keys += [teacher_invitation_ids_cache_key(user_id) for user_id in instance.invitations.values_list('user_id', flat=True)]
+    cache.delete_many(keys)
+
+@receiver(pre_delete, sender=Student)
+def invalidate_deleted_student(sender, instance, **kwargs):
+    keys = [teacher_invitation_ids_cache_key(instance.user_id)]
+    keys += [student_ids_cache_key(user_id) for user_id in instance.teachers.values_list('user_id', flat=True)]
+    keys += [student_invitation_ids_cache_key(user_id) for user_id in instance.invitations.values_list('user_id', flat=True)]
+    cache.delete_many(keys)
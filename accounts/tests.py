@@ -1,8 +1,17 @@
+import datetime
 from django.test import Client
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from tracker.models import Goal, Task, Practice, Challenge
 from .models import Teacher, Student
 import pytest
 from django.shortcuts import reverse
 from .forms import InvitationForm
+from .permissions import is_owner_or_is_teacher, is_teacher
+from .cache import get_student_ids
+from suggestions.views import SuggestionsListView
+
+UserModel = get_user_model()
 
 @pytest.mark.django_db
 def test_login_view_post(user):
@@ -107,4 +116,148 @@ def test_teacher_invite_view_post_creates_profiles(client, user, logged, user2):
     assert Teacher.objects.get(user=user)
     assert Student.objects.get(user=user2)
     teacher = Teacher.objects.get(user=user)
-    assert teacher.invitations.all().contains(user2.student)
\ No newline at end of file
+    assert teacher.invitations.all().contains(user2.student)
+@pytest.mark.django_db
+def test_owner_permission_mixin_fetches_owner_once(client, user, logged, django_assert_num_queries):
+    """
+    Owner is fetched once per request and reused by permission check and view.
+    """
+    url = reverse('suggestions:list', args=[user.username])
+    response = client.get(url)
+    with django_assert_num_queries(5):
+        # session, user, owner, teacher profile in links, suggested tasks
+        response = client.get(url)
+    assert response.status_code == 200
+    assert response.context['owner'] == user
+
+@pytest.mark.django_db
+def test_owner_permission_mixin_memoizes_permission_results(rf, user, user2, student):
+    """
+    Permission check result is memoized on the request.
+    """
+    teacher = Teacher.objects.create(user=user2)
+    teacher.students.add(student)
+    request = rf.get('/')
+    request.user = user2
+    view = SuggestionsListView()
+    view.setup(request, username=user.username)
+    assert view.has_permission(is_owner_or_is_teacher)
+    teacher.students.remove(student)
+    assert view.has_permission(is_owner_or_is_teacher)
+    assert request.permission_results == {('is_owner_or_is_teacher', user.pk): True}
+
+@pytest.mark.django_db
+def test_is_teacher_with_owner_without_student_profile(user, user2):
+    """
+    Teacher check returns False instead of failing for users without student profile.
+    """
+    Teacher.objects.create(user=user2)
+    assert not is_teacher(user2, user.username)
+
+@pytest.mark.django_db
+def test_student_ids_cache_is_invalidated_on_relation_change(user, user2, student, teacher, django_assert_num_queries):
+    """
+    Teacher's student ids are cached and refreshed after students are added or removed from either side.
+    """
+    assert get_student_ids(user2.pk) == set()
+    teacher.students.add(student)
+    assert get_student_ids(user2.pk) == {user.pk}
+    with django_assert_num_queries(0):
+        assert is_teacher(user2, user)
+    student.teachers.remove(teacher)
+    assert get_student_ids(user2.pk) == set()
+    student.teachers.add(teacher)
+    student.teachers.clear()
+    assert not is_teacher(user2, user)
+
+@pytest.mark.django_db
+def test_cached_permission_check_makes_no_queries(user, user2, student, teacher, django_assert_num_queries):
+    """
+    Only the first teacher permission check reads students from the database, next ones use the configured cache.
+    """
+    teacher.students.add(student)
+    with django_assert_num_queries(1):
+        assert is_teacher(user2, user)
+    with django_assert_num_queries(0):
+        assert is_teacher(user2, user)
+        assert is_owner_or_is_teacher(user2, user)
+
+@pytest.mark.django_db
+def test_student_ids_cache_is_invalidated_when_teacher_is_deactivated(user, user2, student, teacher):
+    """
+    Teacher with is_teacher switched off has no students.
+    """
+    teacher.students.add(student)
+    assert is_teacher(user2, user)
+    teacher.is_teacher = False
+    teacher.save()
+    assert not is_teacher(user2, user)
+
+@pytest.mark.django_db
+def test_accept_student_invitation_view_get(client, user, user2, student, teacher):
+    """
+    Accept student invitation view is available only for invited teacher.
+    """
+    client.force_login(user2)
+    url = reverse('accounts:accept_student', args=[user.username])
+    assert client.get(url).status_code == 404
+    student.invitations.add(teacher)
+    assert client.get(url).status_code == 200
+    teacher.student_invitations.remove(student)
+    assert client.get(url).status_code == 404
+
+@pytest.fixture
+def studio(teacher):
+    """
+    Teacher with three students, two of them practicing this week.
+    """
+    today = timezone.localdate()
+    students = []
+    for number in range(3):
+        user = UserModel.objects.create_user(username=f'student{number}', password='password')
+        teacher.students.add(Student.objects.create(user=user))
+        students.append(user)
+    for number, user in enumerate(students[:2]):
+        task = Task.objects.create(user=user, goal=Goal.objects.create(user=user), is_suggested=True)
+        Practice.objects.create(task=task, date=today, time=datetime.timedelta(minutes=15 * (number + 1)))
+        Practice.objects.create(task=task, date=today - datetime.timedelta(days=8), time=datetime.timedelta(minutes=50))
+        Challenge.objects.create(user=user, task=task)
+        Challenge.objects.create(user=user, task=task, is_completed=True)
+    return students
+
+@pytest.mark.django_db
+def test_students_overview_view(client, user2, studio):
+    """
+    Overview shows week's practice minutes, last practice, open challenges and suggested tasks of every student.
+    """
+    client.force_login(user2)
+    response = client.get(reverse('accounts:students_overview'))
+    students = {student.username: student for student in response.context['students']}
+    assert set(students) == {'student0', 'student1', 'student2'}
+    assert students['student1'].week_minutes == 30
+    assert students['student1'].last_practice_date == timezone.localdate()
+    assert (students['student1'].open_challenges, students['student1'].suggested_tasks) == (1, 1)
+    assert students['student2'].week_minutes == 0
+    assert students['student2'].last_practice_date is None
+
+@pytest.mark.django_db
+def test_students_overview_queries_do_not_grow_with_students(client, user2, studio, teacher, django_assert_num_queries):
+    """
+    Overview runs the same number of queries for any number of students.
+    """
+    client.force_login(user2)
+    with django_assert_num_queries(9):
+        client.get(reverse('accounts:students_overview'))
+    for number in range(3, 6):
+        user = UserModel.objects.create_user(username=f'student{number}', password='password')
+        teacher.students.add(Student.objects.create(user=user))
+        Task.objects.create(user=user, goal=Goal.objects.create(user=user), is_suggested=True)
+    with django_assert_num_queries(9):
+        client.get(reverse('accounts:students_overview'))
+
+@pytest.mark.django_db
+def test_students_overview_is_forbidden_for_non_teachers(client, user, logged):
+    """
+    Users who aren't teachers can't see the overview.
+    """
+    assert client.get(reverse('accounts:students_overview')).status_code == 403
@@ -14,5 +14,6 @@ urlpatterns = [
     path('user/invite-student', views.TeacherInviteView.as_view(), name='invite_student'),
     path('user/accept-student/<str:username>', views.AcceptStudentInvitationView.as_view(), name='accept_student'),
     path('user/accept-teacher/<str:username>', views.AcceptTeacherInvitationView.as_view(), name='accept_teacher'),
-    path('user/invitations', views.InvitationListView.as_view(), name='invitation_list')
+    path('user/invitations', views.InvitationListView.as_view(), name='invitation_list'),
+    path('user/students', views.StudentsOverviewView.as_view(), name='students_overview'),
 ]
\ No newline at end of file
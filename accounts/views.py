@@ -3,15 +3,17 @@ from django.shortcuts import render, reverse, redirect, get_object_or_404
 from django.views import View
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.views import LoginView
-from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.auth.decorators import login_not_required
+from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.auth import get_user_model, login, logout, get_user
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from .forms import InvitationForm
 from .models import Teacher, Student
 from django.forms import modelform_factory
-from .permissions import is_owner_or_is_teacher, is_owner
+from .permissions import OwnerPermissionMixin, is_owner_or_is_teacher, is_owner
+from .cache import get_student_ids, get_student_invitation_ids, get_teacher_invitation_ids
+from .overview import get_students_overview
 
 UserModel = get_user_model()
 
@@ -52,12 +54,12 @@ class LogoutView(View):
         logout(request)
         return redirect('accounts:login')
 
-class UserDetailView(UserPassesTestMixin, View):
+class UserDetailView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
 
         if not hasattr(owner, 'teacher'):
             is_teacher = False
@@ -172,12 +174,11 @@ class AcceptStudentInvitationView(View):
     def get(self, request, username):
         inviting_user = get_object_or_404(UserModel, username=username)
         invited_user = get_user(request)
-        if hasattr(inviting_user, 'student') and hasattr(invited_user, 'teacher'):
-            if invited_user.teacher.student_invitations.contains(inviting_user.student):
-                return render(request, 'accounts/confirmation_form.html', {
-                    'question': f"Czy chcesz potwierdzić zaproszenie od studenta {inviting_user.username}",
-                    'owner': request.user
-                })
+        if inviting_user.pk in get_student_invitation_ids(invited_user.pk):
+            return render(request, 'accounts/confirmation_form.html', {
+                'question': f"Czy chcesz potwierdzić zaproszenie od studenta {inviting_user.username}",
+                'owner': request.user
+            })
         raise Http404("Page not found.")
 
     def post(self, request, username):
@@ -203,12 +204,11 @@ class AcceptTeacherInvitationView(View):
     def get(self, request, username):
         inviting_user = get_object_or_404(UserModel, username=username)
         invited_user = get_user(request)
-        if hasattr(inviting_user, 'teacher') and hasattr(invited_user, 'student'):
-            if invited_user.student.teacher_invitations.contains(inviting_user.teacher):
-                return render(request, 'accounts/confirmation_form.html', {
-                    'question': f"Czy chcesz potwierdzić zaproszenie od studenta {inviting_user.username}",
-                    'owner': request.user
-                })
+        if inviting_user.pk in get_teacher_invitation_ids(invited_user.pk):
+            return render(request, 'accounts/confirmation_form.html', {
+                'question': f"Czy chcesz potwierdzić zaproszenie od studenta {inviting_user.username}",
+                'owner': request.user
+            })
         raise Http404("Page not found.")
 
     def post(self, request, username):
@@ -243,3 +243,11 @@ class InvitationListView(View):
                 'owner': request.user
             }
         )
+
+class StudentsOverviewView(UserPassesTestMixin, View):
+    def test_func(self):
+        return hasattr(self.request.user, 'teacher') and self.request.user.teacher.is_teacher
+
+    def get(self, request):
+        students = get_students_overview(get_student_ids(request.user.pk))
+        return render(request, 'accounts/students_overview.html', {'students': students, 'year': timezone.localdate().year})
@@ -0,0 +1,14 @@
+from jobs.queue import register
+from tracker.models import Challenge
+
+
+@register()
+def check_challenge(challenge_id):
+    Challenge.objects.filter(pk=challenge_id).set_are_requirements_fulfilled()
+
+@register(concurrency=1)
+def check_challenges(user_id=None):
+    challenges = Challenge.objects.filter(is_completed=False)
+    if user_id is not None:
+        challenges = challenges.filter(user_id=user_id)
+    challenges.set_are_requirements_fulfilled()
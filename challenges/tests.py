@@ -1,8 +1,12 @@
 import pytest
+import datetime
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from tasks.forms import TaskForm
 from .forms import ChallengeForm
-from tracker.models import Task, Challenge
+from tracker.models import Task, Challenge, Practice
+from jobs.queue import enqueue, work
 
 @pytest.mark.django_db
 def test_challenge_list_view(client, user, logged):
@@ -35,6 +39,55 @@ def test_challenge_list_view_with_multiple_challenges(client, user, logged, goal
     assert response.status_code == 200
     assert response.context['challenge_list'].count() == 2
 
+@pytest.mark.django_db
+def test_challenge_list_view_shows_progress(client, user, logged, goal_task_challenge):
+    """
+    Challenge list view shows practiced days and repetitions against challenge's thresholds.
+    """
+    goal_task_challenge.minimum_number_of_days = 3
+    goal_task_challenge.minimum_total_repetitions = 10
+    goal_task_challenge.save()
+    Practice.objects.create(task=goal_task_challenge.task, date='2025-08-12', repetitions=2)
+    Practice.objects.create(task=goal_task_challenge.task, date='2025-08-13', repetitions=4)
+    url = reverse('challenges:list', args=[user.username])
+    response = client.get(url)
+    challenge = response.context['page_obj'][0]
+    assert (challenge.number_of_days, challenge.total_repetitions) == (2, 6)
+    assert 'Dni: 2 / 3, powtórzenia: 6 / 10' in response.content.decode()
+
+@pytest.mark.django_db
+def test_challenge_list_view_queries_do_not_grow_with_challenges(client, user, logged, goal, piece, django_assert_num_queries):
+    """
+    Challenge list view renders with the same number of queries regardless of number of challenges.
+    """
+    url = reverse('challenges:list', args=[user.username])
+    def create_challenges():
+        for task in [Task.objects.create(user=user, goal=goal), Task.objects.create(user=user, piece=piece)]:
+            Challenge.objects.create(user=user, task=task)
+            Practice.objects.create(task=task, date='2025-08-12', repetitions=1)
+    create_challenges()
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    create_challenges()
+    create_challenges()
+    with django_assert_num_queries(len(queries)):
+        client.get(url)
+
+@pytest.mark.django_db
+def test_challenge_list_view_is_paginated(client, user, logged, goal):
+    """
+    Challenge list view shows newest challenges first, one page at a time.
+    """
+    task = Task.objects.create(user=user, goal=goal)
+    challenges = Challenge.objects.bulk_create([Challenge(user=user, task=task) for _ in range(25)])
+    url = reverse('challenges:list', args=[user.username])
+    response = client.get(url)
+    assert len(response.context['page_obj']) == 20
+    assert response.context['page_obj'][0].pk == max(challenge.pk for challenge in challenges)
+    response = client.get(url, {'after': response.context['page_obj'].next_cursor})
+    assert len(response.context['page_obj']) == 5
+    assert not response.context['page_obj'].has_next
+
 @pytest.mark.django_db
 def test_challenge_detail_view(client, user, logged, goal_task_challenge):
     """
@@ -106,3 +159,78 @@ def test_challenge_delete_view_post(client, user, logged, goal_task_challenge):
     operation = {'operation': 'Tak'}
     response = client.post(url, operation)
     assert not Challenge.objects.all().contains(goal_task_challenge)
+
+@pytest.fixture
+def practiced_challenge(user, goal_task_challenge):
+    task = goal_task_challenge.task
+    task.was_practiced = True
+    task.save()
+    for day, repetitions in [(1, 5), (1, 5), (2, 2), (3, 4)]:
+        Practice.objects.create(task=task, date=datetime.date(2025, 8, day), repetitions=repetitions)
+    return goal_task_challenge
+
+@pytest.mark.django_db
+def test_challenge_with_progress(practiced_challenge):
+    """
+    Progress counts distinct days with enough repetitions and sums all repetitions.
+    """
+    practiced_challenge.minimum_number_of_repetitions = 4
+    practiced_challenge.save()
+    challenge = Challenge.objects.with_progress().get(pk=practiced_challenge.pk)
+    assert challenge.number_of_days == 2
+    assert challenge.total_repetitions == 16
+
+@pytest.mark.django_db
+def test_challenge_with_progress_reads_task_statistics(practiced_challenge, piece_task_challenge):
+    """
+    Total repetitions, and days of challenges without minimum repetitions per day, are read from task statistics.
+    """
+    Practice.objects.bulk_create([Practice(task=practiced_challenge.task, date=datetime.date(2025, 8, 4), repetitions=5)])
+    challenges = Challenge.objects.with_progress().in_bulk()
+    assert challenges[practiced_challenge.pk].number_of_days == 3
+    assert challenges[practiced_challenge.pk].total_repetitions == 16
+    assert challenges[piece_task_challenge.pk].number_of_days == 0
+    assert challenges[piece_task_challenge.pk].total_repetitions == 0
+
+@pytest.mark.django_db
+def test_challenge_check_if_fulfilled(practiced_challenge):
+    """
+    Challenge is fulfilled when both days and total repetitions requirements are met.
+    """
+    practiced_challenge.minimum_number_of_days = 3
+    practiced_challenge.minimum_total_repetitions = 16
+    assert practiced_challenge.check_if_fulfilled()
+    challenge = Challenge.objects.get(pk=practiced_challenge.pk)
+    challenge.minimum_number_of_days = 4
+    assert not challenge.check_if_fulfilled()
+
+@pytest.mark.django_db
+def test_challenges_set_are_requirements_fulfilled_in_constant_queries(user, goal, django_assert_num_queries):
+    """
+    Requirements of many challenges are evaluated with one query and saved with one bulk update.
+    """
+    for i in range(10):
+        task = Task.objects.create(user=user, goal=goal, was_practiced=True)
+        Practice.objects.create(task=task, date=datetime.date(2025, 8, 1), repetitions=i)
+        Challenge.objects.create(user=user, task=task, minimum_total_repetitions=5)
+    with django_assert_num_queries(2):
+        challenges = Challenge.objects.filter(user=user).set_are_requirements_fulfilled()
+    assert len(challenges) == 10
+    assert Challenge.objects.filter(are_requirements_fulfilled=True).count() == 5
+
+@pytest.mark.django_db
+def test_check_challenges_job(practiced_challenge):
+    """
+    Queued challenge check saves fulfilled requirements.
+    """
+    enqueue('challenges.jobs.check_challenges', user_id=practiced_challenge.user_id)
+    work(burst=True)
+    practiced_challenge.refresh_from_db()
+    assert practiced_challenge.are_requirements_fulfilled
+
+@pytest.mark.django_db
+def test_challenge_detail_view_max_queries(user, logged, goal_task_challenge, assert_max_view_queries):
+    """
+    Challenge detail view loads challenge's task with its piece and goal.
+    """
+    assert_max_view_queries(reverse('challenges:detail', args=[user.username, goal_task_challenge.pk]), 5)
@@ -4,44 +4,51 @@ from .forms import ChallengeForm
 from tasks.forms import TaskForm
 from django.views import View
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import UserPassesTestMixin
-from accounts.permissions import is_owner_or_is_teacher, is_teacher, is_student
+from tracker.pagination import KeysetPaginationMixin
+from accounts.permissions import OwnerPermissionMixin, is_owner_or_is_teacher, is_teacher, is_student
 
 UserModel = get_user_model()
 
-class ChallengeListView(UserPassesTestMixin, View):
+class ChallengeListView(OwnerPermissionMixin, KeysetPaginationMixin, View):
+    keyset_ordering = ('-id',)
+    item_url_name = 'challenges:detail'
+
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get_queryset(self):
+        return Challenge.objects.filter(user=self.owner).for_display().with_progress()
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
-        challenge_list =  Challenge.objects.filter(user=owner)
+        owner = self.owner
+        challenge_list = self.get_queryset()
+        page_obj = self.paginate_keyset(challenge_list)
         return render(request, "challenges/challenge_list.html", {
             'challenge_list': challenge_list,
+            'page_obj': page_obj,
             'owner': owner
         })
 
-class ChallengeDetailView(UserPassesTestMixin, View):
+class ChallengeDetailView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
-        challenge = get_object_or_404(Challenge, pk=kwargs['pk'])
-        task = Task.objects.select_related('challenge')
-        return render(request, 'challenges/challenge_detail.html', {'challenge': challenge, 'task': task, 'owner': owner})
+        owner = self.owner
+        challenge = get_object_or_404(Challenge.objects.for_display(), pk=kwargs['pk'])
+        return render(request, 'challenges/challenge_detail.html', {'challenge': challenge, 'task': challenge.task, 'owner': owner})
 
-class ChallengeCreateView(UserPassesTestMixin, View):
+class ChallengeCreateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         forms = [TaskForm(user=owner), ChallengeForm()]
         return render(request, 'challenges/create_forms.html', {'forms': forms, 'owner': owner})
 
     def post(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         task_form = TaskForm(request.POST, user=owner)
         challenge_form = ChallengeForm(request.POST)
         task = task_form.save(commit=False)
@@ -55,18 +62,18 @@ class ChallengeCreateView(UserPassesTestMixin, View):
         task.save()
         return redirect('challenges:list', owner.username)
 
-class ChallengeCreateFromTaskView(UserPassesTestMixin, View):
+class ChallengeCreateFromTaskView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, task_id):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         task = get_object_or_404(Task, pk=task_id)
         forms = [TaskForm(user=owner, instance=task), ChallengeForm()]
         return render(request, 'challenges/create_forms.html', {'forms': forms, 'owner': owner, 'page_title': 'Utwórz wyzwanie'})
 
     def post(self, request, username, task_id):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         task_form = TaskForm(request.POST, user=owner)
         challenge_form = ChallengeForm(request.POST)
         task = task_form.save(commit=False)
@@ -80,12 +87,12 @@ class ChallengeCreateFromTaskView(UserPassesTestMixin, View):
         task.save()
         return redirect('challenges:list', username)
 
-class ChallengeDeleteView(UserPassesTestMixin, View):
+class ChallengeDeleteView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username']) and not is_student(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher) and not self.has_permission(is_student)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         challenge = get_object_or_404(Challenge, pk=kwargs['pk'])
         return render(request, 'challenges/delete_form.html', {'object_to_delete': challenge, 'owner':owner})
 
@@ -95,12 +102,12 @@ class ChallengeDeleteView(UserPassesTestMixin, View):
             challenge.delete()
         return redirect('challenges:list', kwargs['username'])
 
-class ChallengeConfirmView(UserPassesTestMixin, View):
+class ChallengeConfirmView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_teacher(self.request.user.username, self.kwargs['username'])
+        return self.has_permission(is_teacher)
 
     def get(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         challenge = get_object_or_404(Challenge, pk=pk)
 
         if challenge.check_if_fulfilled():
@@ -114,7 +121,7 @@ class ChallengeConfirmView(UserPassesTestMixin, View):
         })
 
     def post(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         challenge = get_object_or_404(Challenge, pk=pk)
         if request.POST['operation'] == 'Tak':
             challenge.is_completed = True
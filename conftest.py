@@ -0,0 +1,21 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def assert_max_view_queries(client, django_assert_max_num_queries):
+    """
+    Return a function requesting url with client and failing when the view
+    responds with an error or runs more than max_queries queries.
+    """
+    def assert_max_queries(url, max_queries, **params):
+        with django_assert_max_num_queries(max_queries):
+            response = client.get(url, params)
+        assert response.status_code == 200
+        return response
+    return assert_max_queries
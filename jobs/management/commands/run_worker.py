@@ -0,0 +1,33 @@
+import multiprocessing
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs.queue import work
+
+
+class Command(BaseCommand):
+    help = "Process queued jobs with a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--burst', action='store_true', help="Exit when there are no more jobs to run.")
+        parser.add_argument('--poll-interval', type=float, default=1)
+        parser.add_argument('--visibility-timeout', type=int, default=None, help="Seconds after which a running job is made available again.")
+
+    def handle(self, *args, **options):
+        work_options = {
+            'burst': options['burst'],
+            'poll_interval': options['poll_interval'],
+            'visibility_timeout': options['visibility_timeout'],
+        }
+        if options['processes'] <= 1:
+            processed = work(**work_options)
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
+            return
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=work, kwargs=work_options) for i in range(options['processes'])]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.stdout.write(self.style.SUCCESS("Workers finished."))
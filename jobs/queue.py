@@ -0,0 +1,169 @@
+import datetime
+import os
+import socket
+import threading
+import time
+import traceback
+import zlib
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import Job
+
+JOB_VISIBILITY_TIMEOUT = getattr(settings, 'JOB_VISIBILITY_TIMEOUT', 300)
+JOB_RETRY_DELAY = getattr(settings, 'JOB_RETRY_DELAY', 30)
+
+registry = {}
+running = threading.local()
+
+
+def register(name=None, concurrency=None, max_attempts=3, visibility_timeout=None):
+    """
+    Register function as a job. concurrency limits number of its jobs running at once.
+    visibility_timeout overrides the worker's one for jobs which are known to run longer.
+    """
+    def decorator(func):
+        job_name = name or f"{func.__module__}.{func.__name__}"
+        registry[job_name] = {
+            'func': func,
+            'concurrency': concurrency,
+            'max_attempts': max_attempts,
+            'visibility_timeout': visibility_timeout,
+        }
+        func.job_name = job_name
+        return func
+    return decorator
+
+def enqueue(job, run_at=None, **kwargs):
+    name = getattr(job, 'job_name', job)
+    if name not in registry:
+        raise KeyError(f"Job {name} is not registered.")
+    return Job.objects.create(
+        name=name,
+        kwargs=kwargs,
+        max_attempts=registry[name]['max_attempts'],
+        run_at=run_at or timezone.now()
+    )
+
+def get_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def get_saturated_names(now, names=None):
+    limits = {
+        name: job['concurrency'] for name, job in registry.items()
+        if job['concurrency'] and (names is None or name in names)
+    }
+    if not limits:
+        return []
+    running_jobs = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_until__gte=now,
+        name__in=limits
+    ).values('name').annotate(count=Count('pk'))
+    return [row['name'] for row in running_jobs if row['count'] >= limits[row['name']]]
+
+def lock_job_name(name):
+    """
+    Serialize claiming of jobs with name until the end of transaction, so running jobs counted
+    afterwards include the ones claimed by other workers in the meantime.
+    Row locks don't cover that, because they lock only the claimed job. Other databases
+    supported by the project serialize writing transactions, so only PostgreSQL needs the lock.
+    """
+    connection = transaction.get_connection()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [zlib.crc32(f"jobs:{name}".encode())])
+
+def get_visibility_timeout(name, visibility_timeout=None):
+    return registry.get(name, {}).get('visibility_timeout') or visibility_timeout or JOB_VISIBILITY_TIMEOUT
+
+def claim_job(worker_id, visibility_timeout=None):
+    """
+    Lock the next available job for worker_id until visibility timeout passes.
+    Running jobs whose visibility timeout passed are available again.
+    """
+    saturated_names = set(get_saturated_names(timezone.now()))
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = Job.objects.select_for_update(skip_locked=True).filter(
+                Q(status=Job.PENDING, run_at__lte=now) | Q(status=Job.RUNNING, locked_until__lt=now)
+            ).exclude(name__in=saturated_names).order_by('run_at', 'pk').first()
+            if job is None:
+                return None
+            if job.attempts >= job.max_attempts:
+                job.status = Job.FAILED
+                job.locked_until = None
+                job.finished_at = now
+                job.last_error = job.last_error or "Visibility timeout expired."
+                job.save(update_fields=['status', 'locked_until', 'finished_at', 'last_error'])
+                continue
+            if registry.get(job.name, {}).get('concurrency'):
+                lock_job_name(job.name)
+                if get_saturated_names(now, [job.name]):
+                    saturated_names.add(job.name)
+                    continue
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.visibility_timeout = get_visibility_timeout(job.name, visibility_timeout)
+            job.locked_until = now + datetime.timedelta(seconds=job.visibility_timeout)
+            job.locked_by = worker_id
+            job.save(update_fields=['status', 'attempts', 'locked_until', 'locked_by'])
+            return job
+
+def heartbeat():
+    """
+    Extend visibility timeout of the job run by this worker, so a long job isn't claimed again
+    and still counts against its concurrency limit. Does nothing outside of jobs.
+    """
+    job = getattr(running, 'job', None)
+    if job is None:
+        return
+    job.locked_until = timezone.now() + datetime.timedelta(seconds=job.visibility_timeout)
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by, attempts=job.attempts).update(locked_until=job.locked_until)
+
+def run_job(job):
+    """
+    Run claimed job. Failed jobs are retried with exponential backoff until max_attempts.
+    """
+    changes = {'locked_until': None}
+    if not hasattr(job, 'visibility_timeout'):
+        job.visibility_timeout = get_visibility_timeout(job.name)
+    running.job = job
+    try:
+        registry[job.name]['func'](**job.kwargs)
+    except Exception:
+        now = timezone.now()
+        changes['last_error'] = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            changes['status'] = Job.PENDING
+            changes['run_at'] = now + datetime.timedelta(seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            changes['status'] = Job.FAILED
+            changes['finished_at'] = now
+    else:
+        changes['status'] = Job.DONE
+        changes['finished_at'] = timezone.now()
+    finally:
+        running.job = None
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by, attempts=job.attempts).update(**changes)
+    for field, value in changes.items():
+        setattr(job, field, value)
+    return job
+
+def work(worker_id=None, burst=False, poll_interval=1, visibility_timeout=None, sleep=time.sleep):
+    """
+    Process jobs until stopped. In burst mode return number of processed jobs when queue is empty.
+    """
+    worker_id = worker_id or get_worker_id()
+    processed = 0
+    while True:
+        job = claim_job(worker_id, visibility_timeout)
+        if job is None:
+            if burst:
+                return processed
+            sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
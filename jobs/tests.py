@@ -0,0 +1,142 @@
+import pytest
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from .models import Job
+from . import queue
+from .queue import register, enqueue, claim_job, run_job, work, heartbeat
+
+calls = []
+
+@register(name='tests.record')
+def record(value):
+    calls.append(value)
+
+@register(name='tests.fail', max_attempts=2)
+def fail():
+    raise ValueError("Failed")
+
+@register(name='tests.limited', concurrency=1)
+def limited():
+    pass
+
+@register(name='tests.long', visibility_timeout=3600)
+def long():
+    calls.append(Job.objects.get(status=Job.RUNNING).locked_until)
+    heartbeat()
+    calls.append(Job.objects.get(status=Job.RUNNING).locked_until)
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+@pytest.mark.django_db
+def test_enqueue_unknown_job_raises_error():
+    """
+    Only registered jobs can be enqueued.
+    """
+    with pytest.raises(KeyError):
+        enqueue('tests.unknown')
+
+@pytest.mark.django_db
+def test_work_runs_enqueued_jobs():
+    """
+    Worker in burst mode runs all available jobs and marks them done.
+    """
+    enqueue(record, value=1)
+    enqueue('tests.record', value=2)
+    enqueue(record, value=3, run_at=timezone.now() + datetime.timedelta(hours=1))
+    assert work(burst=True) == 2
+    assert calls == [1, 2]
+    assert Job.objects.filter(status=Job.DONE).count() == 2
+    assert Job.objects.filter(status=Job.PENDING).count() == 1
+
+@pytest.mark.django_db
+def test_failed_job_is_retried_until_max_attempts():
+    """
+    Failed job is rescheduled with backoff and marked failed after last attempt.
+    """
+    job = enqueue(fail)
+    run_job(claim_job('worker'))
+    job.refresh_from_db()
+    assert job.status == Job.PENDING
+    assert job.run_at > timezone.now()
+    assert 'ValueError' in job.last_error
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    run_job(claim_job('worker'))
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+
+@pytest.mark.django_db
+def test_job_is_reclaimed_after_visibility_timeout():
+    """
+    Running job whose worker didn't finish in visibility timeout is claimed again.
+    """
+    job = enqueue(record, value=1)
+    assert claim_job('worker1').pk == job.pk
+    assert claim_job('worker2') is None
+    Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+    reclaimed = claim_job('worker2')
+    assert reclaimed.pk == job.pk
+    assert reclaimed.attempts == 2
+    run_job(reclaimed)
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.locked_by == 'worker2'
+
+@pytest.mark.django_db
+def test_concurrency_limit():
+    """
+    Jobs over the concurrency limit of their name wait for running ones.
+    """
+    enqueue(limited)
+    enqueue(limited)
+    enqueue(record, value=1)
+    first = claim_job('worker1')
+    second = claim_job('worker2')
+    assert first.name == 'tests.limited'
+    assert second.name == 'tests.record'
+    assert claim_job('worker3') is None
+    run_job(first)
+    assert claim_job('worker3').name == 'tests.limited'
+
+@pytest.mark.django_db
+def test_concurrency_limit_is_checked_again_after_locking_job_name(monkeypatch):
+    """
+    Running jobs are counted again once the name is locked, so a worker which counted them
+    before another worker claimed a job with the same name doesn't exceed the limit.
+    """
+    get_saturated_names = queue.get_saturated_names
+    monkeypatch.setattr(queue, 'get_saturated_names', lambda now, names=None: get_saturated_names(now, names) if names else [])
+    enqueue(limited)
+    enqueue(limited)
+    enqueue(record, value=1)
+    assert claim_job('worker1').name == 'tests.limited'
+    assert claim_job('worker2').name == 'tests.record'
+    assert claim_job('worker3') is None
+
+@pytest.mark.django_db
+def test_job_visibility_timeout_and_heartbeat():
+    """
+    Job's own visibility timeout overrides the worker's one and heartbeat extends the lock of running job.
+    """
+    enqueue(long)
+    job = claim_job('worker', visibility_timeout=10)
+    assert job.locked_until > timezone.now() + datetime.timedelta(minutes=59)
+    run_job(job)
+    assert calls[1] > calls[0]
+    heartbeat()
+
+@pytest.mark.django_db
+def test_run_worker_command_in_burst_mode():
+    """
+    Run worker command processes queued jobs and exits in burst mode.
+    """
+    enqueue(record, value=1)
+    out = StringIO()
+    call_command('run_worker', '--burst', stdout=out)
+    assert 'Processed 1 jobs.' in out.getvalue()
+    assert calls == [1]
@@ -0,0 +1,24 @@
+import pytest
+from django.test import Client
+from django.contrib.auth import get_user_model
+from .registry import registry
+
+UserModel = get_user_model()
+
+@pytest.fixture
+def client():
+    return Client()
+
+@pytest.fixture
+def user():
+    return UserModel.objects.create_user(username="test", password="password")
+
+@pytest.fixture
+def staff():
+    return UserModel.objects.create_user(username="staff", password="password", is_staff=True)
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+    yield
+    registry.clear()
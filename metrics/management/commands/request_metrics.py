@@ -0,0 +1,33 @@
+import json
+from django.core.management.base import BaseCommand
+from metrics.registry import METRICS, clear_published, collect_published, summarize_all
+
+
+class Command(BaseCommand):
+    help = "Report query count and latency percentiles per url name published by RequestMetricsMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=METRICS, default='total_ms', help="Metric whose p95 orders the report.")
+        parser.add_argument('--json', action='store_true')
+        parser.add_argument('--clear', action='store_true', help="Remove published metrics after reporting.")
+
+    def handle(self, *args, **options):
+        summaries = summarize_all(collect_published())
+        if options['clear']:
+            clear_published()
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2))
+            return
+        if not summaries:
+            self.stdout.write("No metrics published. Enable REQUEST_METRICS_ENABLED and use a cache shared between processes.")
+            return
+        rows = sorted(summaries.items(), key=lambda item: item[1][options['sort']]['p95'], reverse=True)
+        self.stdout.write(f"{'url name':40} {'count':>7} {'queries p50/p95':>16} {'db ms p95':>10} {'tpl ms p95':>10} {'total ms p50/p95/p99':>22}")
+        for name, summary in rows:
+            queries = summary['queries']
+            total = summary['total_ms']
+            self.stdout.write(
+                f"{name:40} {summary['count']:>7} {queries['p50']:>7}/{queries['p95']:<8} "
+                f"{summary['db_ms']['p95']:>10.1f} {summary['template_ms']['p95']:>10.1f} "
+                f"{total['p50']:>8.1f}/{total['p95']:.1f}/{total['p99']:.1f}"
+            )
@@ -0,0 +1,99 @@
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+from .registry import registry
+
+template_timer = ContextVar('template_timer', default=None)
+
+
+class QueryTimer:
+    """
+    Database execute wrapper counting queries and their time.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.queries += 1
+
+
+class TemplateTimer:
+    """
+    Accumulates time of outermost template renders.
+    """
+    def __init__(self):
+        self.duration = 0
+        self.depth = 0
+
+
+def instrument_templates():
+    """
+    Wrap render of Django backend templates once to add their time to the current request's timer.
+    """
+    if getattr(Template.render, 'is_instrumented', False):
+        return
+    render = Template.render
+
+    def timed_render(self, *args, **kwargs):
+        timer = template_timer.get()
+        if timer is None:
+            return render(self, *args, **kwargs)
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timer.depth -= 1
+            if timer.depth == 0:
+                timer.duration += time.perf_counter() - start
+
+    timed_render.is_instrumented = True
+    Template.render = timed_render
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, database, template and total time of every request per resolved url name
+    and adds them to the Server-Timing header. Enabled with REQUEST_METRICS_ENABLED setting.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrument_templates()
+
+    def __call__(self, request):
+        query_timer = QueryTimer()
+        timer = TemplateTimer()
+        token = template_timer.set(timer)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(query_timer))
+                response = self.get_response(request)
+        finally:
+            template_timer.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = query_timer.duration * 1000
+        template_ms = timer.duration * 1000
+        match = request.resolver_match
+        name = match.view_name if match else 'unresolved'
+        registry.record(name, query_timer.queries, db_ms, template_ms, total_ms)
+        registry.publish()
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{query_timer.queries} queries"',
+            f'tpl;dur={template_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+        return response
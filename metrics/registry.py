@@ -0,0 +1,97 @@
+import math
+import os
+import socket
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from django.core.cache import cache
+
+REQUEST_METRICS_SAMPLE_SIZE = getattr(settings, 'REQUEST_METRICS_SAMPLE_SIZE', 1000)
+REQUEST_METRICS_PUBLISH_INTERVAL = getattr(settings, 'REQUEST_METRICS_PUBLISH_INTERVAL', 10)
+REQUEST_METRICS_CACHE_TIMEOUT = getattr(settings, 'REQUEST_METRICS_CACHE_TIMEOUT', 60 * 60)
+METRICS = ['queries', 'db_ms', 'template_ms', 'total_ms']
+PERCENTILES = [50, 95, 99]
+PROCESSES_KEY = 'request_metrics:processes'
+
+
+def percentile(values, rank):
+    """
+    Nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return None
+    return values[max(math.ceil(rank / 100 * len(values)) - 1, 0)]
+
+def summarize(samples):
+    """
+    Return number of samples and percentiles and maximum of every metric for samples of one url name.
+    """
+    summary = {'count': len(samples)}
+    for index, metric in enumerate(METRICS):
+        values = sorted(sample[index] for sample in samples)
+        summary[metric] = {f'p{rank}': percentile(values, rank) for rank in PERCENTILES}
+        summary[metric]['max'] = values[-1] if values else None
+    return summary
+
+def summarize_all(snapshot):
+    return {name: summarize(samples) for name, samples in sorted(snapshot.items())}
+
+
+class MetricsRegistry:
+    """
+    Keeps last samples of query count, database, template and total time per url name in process memory.
+    """
+    def __init__(self, sample_size=None):
+        self.sample_size = sample_size or REQUEST_METRICS_SAMPLE_SIZE
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.published_at = time.monotonic()
+
+    def record(self, name, queries, db_ms, template_ms, total_ms):
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.sample_size)
+            self.samples[name].append((queries, db_ms, template_ms, total_ms))
+
+    def snapshot(self):
+        with self.lock:
+            return {name: list(samples) for name, samples in self.samples.items()}
+
+    def clear(self):
+        with self.lock:
+            self.samples = {}
+
+    def publish(self, force=False):
+        """
+        Store snapshot in cache, at most once per publish interval, so the report command
+        can merge samples of all processes. It needs a cache shared between processes.
+        """
+        now = time.monotonic()
+        if not force and now - self.published_at < REQUEST_METRICS_PUBLISH_INTERVAL:
+            return False
+        self.published_at = now
+        key = f'request_metrics:{socket.gethostname()}:{os.getpid()}'
+        cache.set(key, self.snapshot(), REQUEST_METRICS_CACHE_TIMEOUT)
+        processes = cache.get(PROCESSES_KEY, set())
+        if key not in processes:
+            cache.set(PROCESSES_KEY, processes | {key}, REQUEST_METRICS_CACHE_TIMEOUT)
+        return True
+
+
+def collect_published():
+    """
+    Merge snapshots published by all processes.
+    """
+    processes = cache.get(PROCESSES_KEY, set())
+    merged = {}
+    for snapshot in cache.get_many(list(processes)).values():
+        for name, samples in snapshot.items():
+            merged.setdefault(name, []).extend(samples)
+    return merged
+
+def clear_published():
+    cache.delete_many(list(cache.get(PROCESSES_KEY, set())) + [PROCESSES_KEY])
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,83 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from .registry import registry, percentile, summarize
+
+
+def test_summarize_percentiles():
+    """
+    Summary contains nearest-rank percentiles and maximum of every metric.
+    """
+    samples = [(queries, queries * 2.0, 1.0, queries * 10.0) for queries in range(1, 101)]
+    summary = summarize(samples)
+    assert summary['count'] == 100
+    assert summary['queries'] == {'p50': 50, 'p95': 95, 'p99': 99, 'max': 100}
+    assert summary['total_ms']['p95'] == 950.0
+    assert percentile([], 50) is None
+
+def test_registry_keeps_last_samples():
+    """
+    Registry keeps only the newest samples of every url name.
+    """
+    registry.sample_size = 3
+    try:
+        registry.clear()
+        for queries in range(5):
+            registry.record('tracker:goal_list', queries, 0, 0, 0)
+        assert [sample[0] for sample in registry.snapshot()['tracker:goal_list']] == [2, 3, 4]
+    finally:
+        registry.sample_size = 1000
+
+@pytest.mark.django_db
+@override_settings(REQUEST_METRICS_ENABLED=True)
+def test_middleware_records_request_metrics(client, user):
+    """
+    Middleware records queries and timings under url name and sends them in Server-Timing header.
+    """
+    client.force_login(user)
+    response = client.get(reverse('tracker:goal_list', args=[user.username]))
+    samples = registry.snapshot()['tracker:goal_list']
+    queries, db_ms, template_ms, total_ms = samples[0]
+    assert queries >= 3
+    assert 0 < template_ms <= total_ms
+    assert db_ms <= total_ms
+    assert f'desc="{queries} queries"' in response['Server-Timing']
+    assert 'tpl;dur=' in response['Server-Timing'] and 'total;dur=' in response['Server-Timing']
+
+@pytest.mark.django_db
+def test_middleware_is_disabled_by_default(client, user):
+    """
+    Without REQUEST_METRICS_ENABLED nothing is recorded.
+    """
+    client.force_login(user)
+    response = client.get(reverse('tracker:goal_list', args=[user.username]))
+    assert 'Server-Timing' not in response
+    assert registry.snapshot() == {}
+
+@pytest.mark.django_db
+def test_metrics_view_is_staff_only(client, user, staff):
+    """
+    Metrics report is available only to staff.
+    """
+    registry.record('tracker:goal_list', 4, 1.0, 2.0, 5.0)
+    client.force_login(user)
+    assert client.get(reverse('metrics:report')).status_code == 403
+    client.force_login(staff)
+    response = client.get(reverse('metrics:report'))
+    assert response.json()['metrics']['tracker:goal_list']['queries']['p50'] == 4
+
+@pytest.mark.django_db
+def test_request_metrics_command_reports_published_metrics():
+    """
+    Report command merges metrics published by processes.
+    """
+    registry.record('tracker_calendar:year', 12, 3.0, 4.0, 20.0)
+    registry.publish(force=True)
+    out = StringIO()
+    call_command('request_metrics', '--clear', stdout=out)
+    assert 'tracker_calendar:year' in out.getvalue()
+    out = StringIO()
+    call_command('request_metrics', stdout=out)
+    assert 'No metrics published.' in out.getvalue()
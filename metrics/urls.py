@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+app_name = 'metrics'
+urlpatterns = [
+    path('metrics/', views.MetricsView.as_view(), name='report'),
+]
@@ -0,0 +1,13 @@
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import JsonResponse
+from django.views import View
+from .registry import collect_published, registry, summarize_all
+
+
+class MetricsView(UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        snapshot = collect_published() if request.GET.get('scope') == 'all' else registry.snapshot()
+        return JsonResponse({'metrics': summarize_all(snapshot)})
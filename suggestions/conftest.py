@@ -0,0 +1,34 @@
+import pytest
+from django.test import Client
+from django.contrib.auth import get_user_model
+from tracker.models import Task, Practice, Goal
+
+UserModel = get_user_model()
+
+@pytest.fixture
+def client():
+    return Client()
+
+@pytest.fixture
+def user():
+    return UserModel.objects.create_user(username="test", password="password")
+
+@pytest.fixture
+def user2():
+    return UserModel.objects.create_user(username="test2", password="password")
+
+@pytest.fixture
+def logged(client, user):
+    client.force_login(user)
+
+@pytest.fixture
+def goal(user):
+    return Goal.objects.create(user=user, name="Koncert")
+
+@pytest.fixture
+def goal_task(user, goal):
+    return Task.objects.create(user=user, goal=goal, was_practiced=True)
+
+@pytest.fixture
+def goal_task_practice(goal_task):
+    return Practice.objects.create(task=goal_task, date='2025-08-12')
@@ -0,0 +1,28 @@
+import time
+from jobs.queue import register, enqueue, heartbeat
+from tracker.models import Task
+from .utils import update_suggested_tasks
+from .mail import send_suggestion_digests
+
+
+@register(concurrency=1)
+def update_suggestions(send_emails=False):
+    update_suggested_tasks()
+    if send_emails:
+        # Digests are queued only now, so they always list the refreshed suggestions.
+        enqueue(send_suggestion_emails)
+
+@register()
+def update_task_suggestion(task_id):
+    task = Task.objects.get(pk=task_id)
+    task.update_is_suggested()
+    task.save(update_fields=['is_suggested'])
+
+def sleep_with_heartbeat(seconds):
+    # Rate limited digests run longer than the visibility timeout, so the job is kept locked between batches.
+    time.sleep(seconds)
+    heartbeat()
+
+@register(concurrency=1, max_attempts=1)
+def send_suggestion_emails():
+    send_suggestion_digests(sleep=sleep_with_heartbeat)
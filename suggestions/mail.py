@@ -0,0 +1,49 @@
+import time
+from itertools import groupby
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from tracker.models import Task
+
+SUGGESTION_EMAILS_PER_MINUTE = getattr(settings, 'SUGGESTION_EMAILS_PER_MINUTE', 60)
+
+
+def get_suggested_tasks():
+    return Task.objects.filter(
+        are_suggestions_enabled=True,
+        is_suggested=True
+    ).exclude(user__email='')
+
+def get_recipient_ids():
+    return list(get_suggested_tasks().order_by('user').values_list('user', flat=True).distinct())
+
+def get_suggestion_digests(tasks=None, chunk_size=2000):
+    """
+    Yield one digest email per user with all of their suggested tasks.
+    Last practice dates are read from task statistics joined in the same query.
+    """
+    tasks = get_suggested_tasks() if tasks is None else tasks
+    tasks = tasks.for_display().select_related('stats').order_by('user', 'pk')
+    for user, user_tasks in groupby(tasks.iterator(chunk_size=chunk_size), key=lambda task: task.user):
+        lines = [task.get_suggestion_text() for task in user_tasks]
+        lines.append("Practice now!")
+        yield EmailMessage("Practice suggestions", "\n".join(lines), to=[user.email])
+
+def send_suggestion_digests(connection=None, per_minute=None, sleep=time.sleep):
+    """
+    Send suggestion digests through one connection, at most per_minute messages per minute.
+    Every batch is loaded completely before sending, so no database cursor stays open while waiting
+    for the next one. Return number of sent messages.
+    """
+    connection = connection or get_connection()
+    per_minute = per_minute or SUGGESTION_EMAILS_PER_MINUTE
+    user_ids = get_recipient_ids()
+    sent = 0
+    started = None
+    with connection:
+        for start in range(0, len(user_ids), per_minute):
+            if started is not None:
+                sleep(max(0, 60 - (time.monotonic() - started)))
+            started = time.monotonic()
+            tasks = get_suggested_tasks().filter(user__in=user_ids[start:start + per_minute])
+            sent += connection.send_messages(list(get_suggestion_digests(tasks))) or 0
+    return sent
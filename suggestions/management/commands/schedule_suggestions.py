@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from jobs.queue import enqueue
+from suggestions.jobs import update_suggestions
+
+
+class Command(BaseCommand):
+    help = "Queue refreshing of suggested tasks followed by sending suggestion emails. Meant to be run daily, e.g. from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-emails', action='store_true', help="Only refresh suggested tasks.")
+
+    def handle(self, *args, **options):
+        job = enqueue(update_suggestions, send_emails=not options['no_emails'])
+        self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk}: {job.name}."))
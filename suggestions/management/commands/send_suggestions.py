@@ -0,0 +1,22 @@
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from suggestions.mail import send_suggestion_digests
+
+
+class Command(BaseCommand):
+    help = "Send one digest email with suggested tasks to every user."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--per-minute', type=int, default=None, help="Maximum number of emails sent per minute.")
+        parser.add_argument('--dry-run', action='store_true', help="Don't send emails, store them in memory or in --file-path.")
+        parser.add_argument('--file-path', default=None, help="Directory for emails written in dry run.")
+
+    def handle(self, *args, **options):
+        connection = None
+        if options['dry_run']:
+            if options['file_path']:
+                connection = get_connection('django.core.mail.backends.filebased.EmailBackend', file_path=options['file_path'])
+            else:
+                connection = get_connection('django.core.mail.backends.locmem.EmailBackend')
+        sent = send_suggestion_digests(connection=connection, per_minute=options['per_minute'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails{' (dry run)' if options['dry_run'] else ''}."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from suggestions.utils import update_suggested_tasks
+from tracker.models import TaskStats
+
+
+class Command(BaseCommand):
+    help = "Recompute is_suggested of all tasks from first practice dates in their statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', default=None, help="Day to compute suggestions for (YYYY-MM-DD), today by default.")
+        parser.add_argument('--refresh', action='store_true', help="Rebuild task statistics from practices first.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = parse_date(options['date'])
+            except ValueError:
+                today = None
+            if today is None:
+                raise CommandError(f"Invalid date: {options['date']}")
+        if options['refresh']:
+            rebuilt = TaskStats.rebuild()
+            self.stdout.write(f"Rebuilt statistics of {rebuilt} tasks.")
+        updated = update_suggested_tasks(today=today)
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} tasks."))
@@ -1,3 +1,176 @@
-from django.test import TestCase
+import pytest
+import datetime
+from io import StringIO
+from django.urls import reverse
+from django.core.management import call_command
+from django.utils import timezone
+from tracker.models import Task, Practice
+from django.contrib.auth import get_user_model
+from .utils import update_suggested_tasks
+from .mail import send_suggestion_digests
+from jobs.models import Job
+from jobs.queue import enqueue, work
 
-# Create your tests here.
+UserModel = get_user_model()
+
+
+@pytest.mark.django_db
+def test_suggestions_list_view(client, user, logged):
+    """
+    Suggestions list view exists and provides correct template.
+    """
+    url = reverse('suggestions:list', args=[user.username])
+    response = client.get(url)
+    assert response.status_code == 200
+    template_names = [t.name for t in response.templates if t.name is not None]
+    assert 'suggestions/task_list.html' in template_names
+
+@pytest.mark.django_db
+def test_update_suggested_tasks_matches_set_is_suggested(user, goal, goal_task, goal_task_practice):
+    """
+    Task is suggested only on the days of repetition intervals after its first practice.
+    """
+    Practice.objects.create(task=goal_task, date='2025-08-20')
+    for days in range(0, 90):
+        today = datetime.date(2025, 8, 12) + datetime.timedelta(days=days)
+        update_suggested_tasks(today=today)
+        goal_task.refresh_from_db()
+        assert goal_task.is_suggested == (days in [3, 4, 7, 28, 84])
+
+@pytest.mark.django_db
+def test_update_suggested_tasks_runs_constant_number_of_queries(user, goal, django_assert_num_queries):
+    """
+    Suggestions of all tasks are updated with one UPDATE.
+    """
+    for i in range(20):
+        task = Task.objects.create(user=user, goal=goal)
+        Practice.objects.create(task=task, date=datetime.date(2025, 8, 1) + datetime.timedelta(days=i))
+    Task.objects.create(user=user, goal=goal)
+    with django_assert_num_queries(1):
+        updated = update_suggested_tasks(today=datetime.date(2025, 8, 23))
+    assert updated == 3
+    assert Task.objects.filter(is_suggested=True).count() == 3
+    with django_assert_num_queries(1):
+        update_suggested_tasks(today=datetime.date(2025, 8, 24))
+    assert set(Task.objects.filter(is_suggested=True).values_list('stats__first_practice_date', flat=True)) == {
+        datetime.date(2025, 8, 20), datetime.date(2025, 8, 17)
+    }
+
+@pytest.mark.django_db
+def test_update_suggestions_command(goal_task, goal_task_practice):
+    """
+    Update suggestions command sets is_suggested for given date.
+    """
+    out = StringIO()
+    call_command('update_suggestions', '--date', '2025-08-15', '--refresh', stdout=out)
+    goal_task.refresh_from_db()
+    assert goal_task.is_suggested
+    assert 'Updated 1 tasks.' in out.getvalue()
+
+@pytest.fixture
+def suggested_tasks(user, goal):
+    user.email = 'test@example.com'
+    user.save()
+    tasks = [Task.objects.create(user=user, goal=goal, is_suggested=True) for i in range(3)]
+    for task in tasks:
+        Practice.objects.create(task=task, date='2025-08-12')
+        Practice.objects.create(task=task, date='2025-08-15')
+    Task.objects.create(user=user, goal=goal, is_suggested=True, are_suggestions_enabled=False)
+    return tasks
+
+@pytest.mark.django_db
+def test_send_suggestion_digests_sends_one_email_per_user(suggested_tasks, mailoutbox, django_assert_num_queries):
+    """
+    All suggested tasks of user are sent in one email, loaded with one query after the recipients.
+    """
+    with django_assert_num_queries(2):
+        sent = send_suggestion_digests()
+    assert sent == 1
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].to == ['test@example.com']
+    assert mailoutbox[0].body.count('2025-08-15') == 3
+    assert '2025-08-12' not in mailoutbox[0].body
+
+@pytest.mark.django_db
+def test_suggestion_digest_of_task_without_statistics(user, goal, mailoutbox):
+    """
+    Digest doesn't render missing last practice date of task without statistics.
+    """
+    user.email = 'test@example.com'
+    user.save()
+    Task.objects.create(user=user, goal=goal, is_suggested=True)
+    send_suggestion_digests()
+    assert "You haven't practiced" in mailoutbox[0].body
+    assert 'None' not in mailoutbox[0].body
+
+@pytest.mark.django_db
+def test_send_suggestion_digests_is_rate_limited(suggested_tasks, user2, goal, mailoutbox):
+    """
+    Dispatcher waits after sending per_minute emails, but not after the last batch.
+    """
+    for user in UserModel.objects.all():
+        user.email = f'{user.username}@example.com'
+        user.save()
+    Task.objects.create(user=user2, goal=goal, is_suggested=True)
+    waits = []
+    sent = send_suggestion_digests(per_minute=1, sleep=waits.append)
+    assert sent == 2
+    assert len(waits) == 1
+    assert all(0 < wait <= 60 for wait in waits)
+
+@pytest.mark.django_db
+def test_send_suggestions_command_dry_run(suggested_tasks, tmp_path):
+    """
+    Dry run writes emails to given directory.
+    """
+    out = StringIO()
+    call_command('send_suggestions', '--dry-run', '--file-path', str(tmp_path), stdout=out)
+    assert 'Sent 1 emails (dry run).' in out.getvalue()
+    assert 'Practice now!' in ''.join(path.read_text() for path in tmp_path.iterdir())
+
+@pytest.mark.django_db
+def test_update_task_suggestion_job(goal_task, goal_task_practice):
+    """
+    Queued task suggestion job recomputes is_suggested from task statistics.
+    """
+    goal_task.is_suggested = True
+    goal_task.save()
+    enqueue('suggestions.jobs.update_task_suggestion', task_id=goal_task.pk)
+    assert work(burst=True) == 1
+    goal_task.refresh_from_db()
+    assert not goal_task.is_suggested
+
+@pytest.mark.django_db
+def test_schedule_suggestions_command_queues_refresh_and_emails(user, goal_task, mailoutbox):
+    """
+    Scheduled refresh of suggestions is run by worker and queues digests, sent after it.
+    """
+    user.email = 'test@example.com'
+    user.save()
+    Practice.objects.create(task=goal_task, date=timezone.localdate() - datetime.timedelta(days=3))
+    out = StringIO()
+    call_command('schedule_suggestions', stdout=out)
+    assert 'suggestions.jobs.update_suggestions' in out.getvalue()
+    assert work(burst=True) == 2
+    assert list(Job.objects.order_by('pk').values_list('name', 'status')) == [
+        ('suggestions.jobs.update_suggestions', Job.DONE),
+        ('suggestions.jobs.send_suggestion_emails', Job.DONE),
+    ]
+    assert len(mailoutbox) == 1
+
+@pytest.mark.django_db
+def test_schedule_suggestions_command_without_emails(goal_task):
+    """
+    Refresh scheduled with --no-emails doesn't queue digests.
+    """
+    call_command('schedule_suggestions', '--no-emails', stdout=StringIO())
+    assert work(burst=True) == 1
+    assert not Job.objects.filter(name='suggestions.jobs.send_suggestion_emails').exists()
+
+@pytest.mark.django_db
+def test_suggestions_list_view_max_queries(user, logged, goal, assert_max_view_queries):
+    """
+    Suggested tasks are listed with their goals in constant number of queries.
+    """
+    Task.objects.bulk_create([Task(user=user, goal=goal, is_suggested=True) for _ in range(5)])
+    assert_max_view_queries(reverse('suggestions:list', args=[user.username]), 5)
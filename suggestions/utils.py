@@ -1,7 +1,34 @@
-from tracker.models import Task
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from tracker.models import Task, TaskStats, SUGGESTION_INTERVALS
+from .mail import send_suggestion_digests
+
+
+def get_suggested_dates(today=None):
+    today = today or timezone.localdate(timezone.now())
+    return {today - interval for interval in SUGGESTION_INTERVALS}
+
+def is_suggested_expression(today=None):
+    """
+    Whether first practice date in task statistics was on one of suggested dates, usable in an UPDATE of tasks.
+    """
+    return Exists(TaskStats.objects.filter(task=OuterRef('pk'), first_practice_date__in=sorted(get_suggested_dates(today))))
+
+def refresh_practiced_tasks(tasks, today=None):
+    """
+    Mark tasks as practiced and recompute their is_suggested in one UPDATE. Statistics of tasks must be up to date.
+    """
+    return tasks.update(was_practiced=True, is_suggested=is_suggested_expression(today))
+
+def update_suggested_tasks(today=None):
+    """
+    Set is_suggested of all tasks from first practice dates in their statistics in one UPDATE,
+    touching only tasks that are suggested now or become suggested. Return number of touched tasks.
+    """
+    return Task.objects.filter(
+        Q(is_suggested=True) | Q(stats__first_practice_date__in=get_suggested_dates(today))
+    ).update(is_suggested=is_suggested_expression(today))
 
 def set_suggested():
-    tasks = Task.objects.filter(are_suggestions_enabled=True).prefetch_related('practice_set')
-    for task in tasks.iterator():
-        task.set_is_suggested()
-        task.send_email_suggestion()
+    update_suggested_tasks()
+    send_suggestion_digests()
@@ -1,6 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from tracker.forms import set_autocomplete_url
 from tracker.models import Task, Practice, Goal, Piece
+from tracker.widgets import AutocompleteSelect
 
 
 class TaskForm(forms.ModelForm):
@@ -8,6 +10,10 @@ class TaskForm(forms.ModelForm):
         model = Task
         use_required_attribute = False
         fields = ('goal', 'piece', 'element', 'method', 'are_suggestions_enabled')
+        widgets = {
+            'goal': AutocompleteSelect(),
+            'piece': AutocompleteSelect(),
+        }
 
 
     def __init__(self, *args, **kwargs):
@@ -16,6 +22,8 @@ class TaskForm(forms.ModelForm):
         if user is not None:
             self.fields['goal'].queryset = Goal.objects.filter(user=user)
             self.fields['piece'].queryset = Piece.objects.filter(user=user)
+            set_autocomplete_url(self.fields['goal'], user, 'goal')
+            set_autocomplete_url(self.fields['piece'], user, 'piece')
 
     def clean(self):
         cleaned_data = super().clean()
@@ -34,3 +42,11 @@ class PracticeForm(forms.ModelForm):
         model = Practice
         use_required_attribute = False
         fields = ('date', 'start_time', 'end_time', 'repetitions', 'is_summarized', 'is_completed')
+
+class PracticeImportForm(PracticeForm):
+    class Meta(PracticeForm.Meta):
+        fields = PracticeForm.Meta.fields + ('time', 'completion_percentage')
+
+class PracticeImportUploadForm(forms.Form):
+    file = forms.FileField(label="Plik")
+    format = forms.ChoiceField(label="Format", choices=[('csv', 'CSV'), ('ndjson', 'NDJSON')])
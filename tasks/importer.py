@@ -0,0 +1,91 @@
+import csv
+import json
+from functools import partial
+from itertools import islice
+from django.db import transaction
+from tracker.models import Task, Practice, Challenge, TaskStats
+from suggestions.utils import refresh_practiced_tasks
+from tracker_calendar.cache import invalidate_month
+from .forms import PracticeImportForm
+
+IMPORT_FORMATS = ['csv', 'ndjson']
+
+
+def parse_csv(lines):
+    """
+    Yield rows of CSV file as dictionaries, reading it line by line.
+    """
+    yield from csv.DictReader(lines)
+
+def parse_ndjson(lines):
+    """
+    Yield one dictionary per non-empty line of NDJSON file.
+    """
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+def parse(lines, import_format):
+    if import_format == 'csv':
+        return parse_csv(lines)
+    if import_format == 'ndjson':
+        return parse_ndjson(lines)
+    raise ValueError(f"Unknown import format: {import_format}")
+
+def get_task_lookup(user):
+    """
+    Map task ids of user, as strings, to task ids so rows are resolved without queries.
+    """
+    return {str(task_id): task_id for task_id in Task.objects.filter(user=user).values_list('pk', flat=True)}
+
+def build_practices(rows, task_lookup, errors):
+    """
+    Validate rows with practice form rules and yield unsaved practices.
+    Rows of other models from practice log export are skipped, invalid rows are appended to errors.
+    """
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append((number, {'__all__': [{'message': "Wiersz musi być obiektem.", 'code': 'invalid'}]}))
+            continue
+        if row.get('model') not in (None, '', 'practice'):
+            continue
+        task_id = task_lookup.get(str(row.get('task_id', row.get('task', ''))))
+        if task_id is None:
+            errors.append((number, {'task': [{'message': "Nie znaleziono zadania.", 'code': 'invalid'}]}))
+            continue
+        form = PracticeImportForm(row)
+        if not form.is_valid():
+            errors.append((number, form.errors.get_json_data()))
+            continue
+        practice = form.save(commit=False)
+        practice.task_id = task_id
+        yield practice
+
+def save_batch(user, practices):
+    """
+    Insert batch of practices and update state of their tasks, task statistics, challenges and calendar.
+    """
+    task_ids = {practice.task_id for practice in practices}
+    tasks = Task.objects.filter(pk__in=task_ids)
+    with transaction.atomic():
+        Practice.objects.bulk_create(practices)
+        TaskStats.rebuild(tasks=tasks)
+        refresh_practiced_tasks(tasks)
+        Challenge.objects.filter(task__in=task_ids).set_are_requirements_fulfilled()
+    for month in {practice.date.replace(day=1) for practice in practices}:
+        transaction.on_commit(partial(invalidate_month, user.pk, month))
+
+def import_practices(user, rows, batch_size=1000):
+    """
+    Import practices of user's tasks from rows in batches, in one transaction,
+    so nothing is saved when reading the file fails after some batches.
+    Return number of created practices and list of row numbers with errors.
+    """
+    errors = []
+    practices = build_practices(rows, get_task_lookup(user), errors)
+    created = 0
+    with transaction.atomic():
+        while batch := list(islice(practices, batch_size)):
+            save_batch(user, batch)
+            created += len(batch)
+    return created, errors
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from tasks.importer import IMPORT_FORMATS, import_practices, parse
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import practices of user's tasks from CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, default=None, help="Defaults to file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = UserModel.objects.get(username=options['username'])
+        except UserModel.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist.")
+        import_format = options['format'] or options['path'].rsplit('.', 1)[-1]
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError(f"Unknown import format: {import_format}")
+        with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+            created, errors = import_practices(user, parse(lines, import_format), batch_size=options['batch_size'])
+        for number, row_errors in errors:
+            messages = "; ".join(f"{field}: {error['message']}" for field, field_errors in row_errors.items() for error in field_errors)
+            self.stderr.write(f"Row {number}: {messages}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} practices, skipped {len(errors)} rows."))
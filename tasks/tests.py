@@ -1,8 +1,14 @@
 import pytest
+import datetime
 from django.urls import reverse
-from tracker.models import Goal, Task, Practice
+from django.utils import timezone
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from tracker.models import Goal, Task, Practice, Challenge
 from accounts.models import Teacher, Student
 from .forms import TaskForm, PracticeForm
+from .importer import import_practices, parse
 
 
 @pytest.mark.django_db
@@ -310,3 +316,152 @@ def test_practice_delete_view_post(client, user, logged, goal_task_practice):
     operation = {'operation': 'Tak'}
     response = client.post(url, operation)
     assert not Practice.objects.all().contains(goal_task_practice)
+
+@pytest.mark.django_db
+def test_practice_views_maintain_first_practice_date(client, user, logged, goal_task):
+    """
+    Creating, updating and deleting practice recomputes first practice date in task statistics.
+    """
+    url = reverse('tasks:practice_create', args=[user.username, goal_task.pk])
+    client.post(url, {'date': '2025-09-12'})
+    client.post(url, {'date': '2025-09-20'})
+    goal_task.stats.refresh_from_db()
+    assert goal_task.stats.first_practice_date == datetime.date(2025, 9, 12)
+    first_practice = Practice.objects.get(task=goal_task, date='2025-09-12')
+    url = reverse('tasks:practice_update', args=[user.username, first_practice.pk])
+    client.post(url, {'date': '2025-09-01'})
+    goal_task.stats.refresh_from_db()
+    assert goal_task.stats.first_practice_date == datetime.date(2025, 9, 1)
+    url = reverse('tasks:practice_delete', args=[user.username, first_practice.pk])
+    client.post(url, {'operation': 'Tak'})
+    goal_task.stats.refresh_from_db()
+    assert goal_task.stats.first_practice_date == datetime.date(2025, 9, 20)
+
+@pytest.mark.django_db
+def test_practice_create_view_sets_is_suggested(client, user, logged, goal_task):
+    """
+    Adding practice three days ago makes task suggested today.
+    """
+    three_days_ago = timezone.localdate(timezone.now()) - datetime.timedelta(days=3)
+    url = reverse('tasks:practice_create', args=[user.username, goal_task.pk])
+    client.post(url, {'date': three_days_ago.isoformat()})
+    goal_task.refresh_from_db()
+    assert goal_task.is_suggested
+
+@pytest.mark.django_db
+def test_import_practices_in_batches(user, goal_task, piece_task, django_assert_num_queries):
+    """
+    Import validates rows, skips invalid ones and updates tasks, statistics and challenges per batch.
+    """
+    challenge = Challenge.objects.create(user=user, task=goal_task, minimum_number_of_days=2)
+    three_days_ago = timezone.localdate(timezone.now()) - datetime.timedelta(days=3)
+    rows = [
+        {'task_id': goal_task.pk, 'date': three_days_ago.isoformat(), 'repetitions': '2'},
+        {'task_id': goal_task.pk, 'date': '2025-08-12', 'repetitions': '3'},
+        {'task_id': piece_task.pk, 'date': '2025-08-13', 'completion_percentage': 50},
+        {'task_id': piece_task.pk, 'date': 'yesterday'},
+        {'task_id': 0, 'date': '2025-08-13'},
+        {'model': 'goal', 'id': 1},
+    ]
+    with django_assert_num_queries(20):
+        created, errors = import_practices(user, rows, batch_size=2)
+    assert created == 3
+    assert [number for number, row_errors in errors] == [4, 5]
+    assert 'date' in errors[0][1] and 'task' in errors[1][1]
+    goal_task.refresh_from_db()
+    piece_task.refresh_from_db()
+    assert goal_task.was_practiced and piece_task.was_practiced
+    assert goal_task.stats.first_practice_date == datetime.date(2025, 8, 12)
+    assert not goal_task.is_suggested
+    assert goal_task.stats.number_of_days == 2
+    assert piece_task.stats.average_completion_percentage == 50
+    challenge.refresh_from_db()
+    assert challenge.are_requirements_fulfilled
+
+@pytest.mark.django_db
+def test_import_practices_rejects_other_users_tasks(user, user2, goal_task):
+    """
+    Rows can't add practices to tasks of other users.
+    """
+    created, errors = import_practices(user2, [{'task_id': goal_task.pk, 'date': '2025-08-12'}])
+    assert created == 0
+    assert not Practice.objects.exists()
+
+@pytest.mark.django_db
+def test_import_practices_saves_nothing_when_file_cant_be_read(user, goal_task):
+    """
+    Batches saved before a line which can't be parsed are rolled back.
+    """
+    lines = [f'{{"task_id": {goal_task.pk}, "date": "2025-08-1{day}"}}\n' for day in range(3)] + ['{"task_id": \n']
+    with pytest.raises(ValueError):
+        import_practices(user, parse(lines, 'ndjson'), batch_size=2)
+    assert not Practice.objects.exists()
+
+@pytest.mark.django_db
+def test_practice_import_view(client, user, logged, goal_task):
+    """
+    Uploaded CSV file is imported and result is shown.
+    """
+    upload = SimpleUploadedFile('log.csv', f"task_id,date,repetitions\n{goal_task.pk},2025-08-12,2\n{goal_task.pk},x,2\n".encode())
+    url = reverse('tasks:practice_import', args=[user.username])
+    response = client.post(url, {'file': upload, 'format': 'csv'})
+    assert response.status_code == 200
+    assert response.context['created'] == 1
+    assert Practice.objects.get().repetitions == 2
+    assert 'Zaimportowano ćwiczeń: 1' in response.content.decode()
+
+@pytest.mark.django_db
+def test_practice_import_view_reads_csv_with_byte_order_mark(client, user, logged, goal_task):
+    """
+    CSV files saved by spreadsheets start with a byte order mark, which isn't part of the first column name.
+    """
+    upload = SimpleUploadedFile('log.csv', f"task_id,date\n{goal_task.pk},2025-08-12\n".encode('utf-8-sig'))
+    response = client.post(reverse('tasks:practice_import', args=[user.username]), {'file': upload, 'format': 'csv'})
+    assert response.context['created'] == 1
+    assert response.context['errors'] == []
+
+@pytest.mark.django_db
+def test_practice_import_view_reports_ndjson_lines_which_are_not_objects(client, user, logged, goal_task):
+    """
+    NDJSON lines with JSON values other than objects are reported as invalid rows.
+    """
+    upload = SimpleUploadedFile('log.ndjson', f'[1, 2]\n{{"task_id": {goal_task.pk}, "date": "2025-08-12"}}\n'.encode())
+    response = client.post(reverse('tasks:practice_import', args=[user.username]), {'file': upload, 'format': 'ndjson'})
+    assert response.context['created'] == 1
+    assert [number for number, row_errors in response.context['errors']] == [1]
+
+@pytest.mark.django_db
+def test_import_practices_command_reads_practice_log_export(user, goal_task_practice, tmp_path):
+    """
+    Practices exported with export_practice_log can be imported back.
+    """
+    path = tmp_path / 'log.ndjson'
+    call_command('export_practice_log', user.username, '--format', 'ndjson', '--output', str(path))
+    out = StringIO()
+    call_command('import_practices', user.username, str(path), stdout=out)
+    assert 'Imported 1 practices, skipped 0 rows.' in out.getvalue()
+    assert Practice.objects.filter(task=goal_task_practice.task, date='2025-08-12').count() == 2
+
+@pytest.fixture
+def many_tasks(user, goal, piece):
+    tasks = Task.objects.bulk_create(
+        [Task(user=user, goal=goal, element=f'{i}') for i in range(5)]
+        + [Task(user=user, piece=piece, element=f'{i}') for i in range(5)]
+    )
+    Practice.objects.bulk_create([Practice(task=task, date='2025-08-12') for task in tasks for _ in range(3)])
+    Task.objects.update(was_practiced=True, is_suggested=True)
+    return tasks
+
+@pytest.mark.django_db
+def test_task_list_view_max_queries(user, logged, many_tasks, assert_max_view_queries):
+    """
+    Task list view loads pieces and goals of listed tasks with the tasks.
+    """
+    assert_max_view_queries(reverse('tasks:list', args=[user.username]), 5)
+
+@pytest.mark.django_db
+def test_task_detail_view_max_queries(user, logged, many_tasks, assert_max_view_queries):
+    """
+    Task detail view loads task with its relations, statistics and practices in constant number of queries.
+    """
+    assert_max_view_queries(reverse('tasks:detail', args=[user.username, many_tasks[0].pk]), 6)
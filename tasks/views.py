@@ -1,48 +1,60 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from tracker.models import Task, Practice
-from .forms import TaskForm, PracticeForm
+from .forms import TaskForm, PracticeForm, PracticeImportUploadForm
+from .importer import import_practices, parse
 from django.views.generic import ListView
 from django.views import View
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import UserPassesTestMixin
-from accounts.permissions import is_owner_or_is_teacher, is_owner
+from accounts.permissions import OwnerPermissionMixin, is_owner_or_is_teacher, is_owner
 from django.forms import modelform_factory
+from tracker.pagination import KeysetPaginationMixin
+import csv
 import datetime
+import io
 
 UserModel = get_user_model()
 
-class TaskListView(UserPassesTestMixin, View):
+class TaskListView(OwnerPermissionMixin, KeysetPaginationMixin, View):
+    item_url_name = 'tasks:detail'
+
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get_queryset(self):
+        return Task.objects.filter(user=self.owner).for_display()
 
     def get(self, request, username):
-        owner = get_object_or_404(UserModel, username=self.kwargs['username'])
-        task_list =  Task.objects.filter(user=owner)
+        owner = self.owner
+        task_list = self.get_queryset()
         return render(request, "tasks/task_list.html", {
             'task_list': task_list,
+            'page_obj': self.paginate_keyset(task_list),
             'owner': owner
         })
 
-class TaskDetailView(UserPassesTestMixin, View):
+class TaskDetailView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
-        task = get_object_or_404(Task, pk=kwargs['pk'])
+        owner = self.owner
+        task = get_object_or_404(
+            Task.objects.for_display().select_related('stats').prefetch_related('practice_set'),
+            pk=kwargs['pk']
+        )
         return render(request, 'tasks/task_detail.html', {'task': task, 'owner': owner})
 
-class TaskCreateView(UserPassesTestMixin, View):
+class TaskCreateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         forms = [TaskForm(user=owner), PracticeForm()]
         return render(request, 'tasks/create_forms.html', {'forms': forms, 'owner': owner, 'page_title': 'Utwórz ćwiczenie'})
 
     def post(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         task_form = TaskForm(request.POST, user=owner)
         practice_form = PracticeForm(request.POST)
         if task_form.is_valid():
@@ -55,34 +67,35 @@ class TaskCreateView(UserPassesTestMixin, View):
                 practice.save()
                 task.practice_set.add(practice)
                 task.was_practiced = True
+                task.update_is_suggested()
                 task.save()
             return redirect('tasks:list', kwargs['username'])
         forms = [task_form, practice_form]
         return render(request, 'tasks/create_forms.html', {'forms': forms, 'owner': owner, 'page_title': 'Utwórz ćwiczenie'})
 
-class TaskUpdateView(UserPassesTestMixin, View):
+class TaskUpdateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         task = get_object_or_404(Task, pk=kwargs['pk'])
         form = TaskForm(instance=task, user=owner)
         return render(request, 'tasks/create_form.html', {'form': form, 'page_title': 'Zaktualizuj zadanie', 'owner': owner})
 
     def post (self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         task = get_object_or_404(Task, pk=kwargs['pk'])
         form = TaskForm(request.POST, user=owner, instance=task)
         task = form.save()
         return redirect('tasks:detail', kwargs['username'], kwargs['pk'])
 
-class TaskDeleteView(UserPassesTestMixin, View):
+class TaskDeleteView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         task = get_object_or_404(Task, pk=kwargs['pk'])
         return render(request, 'tasks/delete_form.html', {'object_to_delete': task, 'owner':owner})
 
@@ -92,12 +105,12 @@ class TaskDeleteView(UserPassesTestMixin, View):
             task.delete()
         return redirect('tasks:list', kwargs['username'])
 
-class PracticeCreateView(UserPassesTestMixin, View):
+class PracticeCreateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         task = get_object_or_404(Task, pk=kwargs['pk'])
         form = PracticeForm()
         return render(request, 'tasks/practice_form.html',{
@@ -107,22 +120,23 @@ class PracticeCreateView(UserPassesTestMixin, View):
             'task': task})
 
     def post(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         task = get_object_or_404(Task, pk=kwargs['pk'])
         form = PracticeForm(request.POST)
         practice = form.save(commit=False)
         practice.task = task
         form.save()
         task.was_practiced = True
+        task.update_is_suggested()
         task.save()
         return redirect('tasks:detail', kwargs['username'], task.pk)
 
-class PracticeUpdateView(UserPassesTestMixin, View):
+class PracticeUpdateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         practice = get_object_or_404(Practice, pk=kwargs['pk'])
         task = get_object_or_404(Task, pk=practice.task.pk)
         form = PracticeForm(instance=practice)
@@ -133,28 +147,58 @@ class PracticeUpdateView(UserPassesTestMixin, View):
             'task': task})
 
     def post(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         practice = get_object_or_404(Practice, pk=kwargs['pk'])
         task = get_object_or_404(Task, pk=practice.task.pk)
         form = PracticeForm(request.POST, instance=practice)
         practice = form.save(commit=False)
         practice.task.pk = task.pk
         form.save()
+        task.update_is_suggested()
+        task.save()
         return redirect('tasks:detail', kwargs['username'], task.pk)
 
-class PracticeDeleteView(UserPassesTestMixin, View):
+class PracticeDeleteView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         practice = get_object_or_404(Practice, pk=kwargs['pk'])
         return render(request, 'tasks/delete_form.html', {'object_to_delete': practice, 'owner':owner})
 
     def post(self, request, *args, **kwargs):
         if request.POST.get('operation') == 'Tak':
             practice = get_object_or_404(Practice, pk=kwargs['pk'])
-            task_pk = practice.task.pk
+            task = practice.task
+            task_pk = task.pk
             practice.delete()
+            task.update_is_suggested()
+            task.save()
         return redirect('tasks:detail', kwargs['username'], task_pk)
 
+class PracticeImportView(OwnerPermissionMixin, View):
+    def test_func(self):
+        return self.has_permission(is_owner)
+
+    def get(self, request, *args, **kwargs):
+        owner = self.owner
+        form = PracticeImportUploadForm()
+        return render(request, 'tasks/practice_import.html', {'form': form, 'owner': owner})
+
+    def post(self, request, *args, **kwargs):
+        owner = self.owner
+        form = PracticeImportUploadForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return render(request, 'tasks/practice_import.html', {'form': form, 'owner': owner})
+        lines = io.TextIOWrapper(form.cleaned_data['file'], encoding='utf-8-sig', newline='')
+        try:
+            created, errors = import_practices(owner, parse(lines, form.cleaned_data['format']))
+        except (ValueError, csv.Error):
+            form.add_error('file', "Nie udało się odczytać pliku, nie zaimportowano żadnych ćwiczeń.")
+            return render(request, 'tasks/practice_import.html', {'form': form, 'owner': owner})
+        return render(request, 'tasks/practice_import.html', {
+            'form': PracticeImportUploadForm(),
+            'owner': owner,
+            'created': created,
+            'errors': errors})
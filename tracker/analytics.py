@@ -0,0 +1,150 @@
+import datetime
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from .models import Practice, Piece, Composer, Style
+
+PERIODS = {
+    'day': F('date'),
+    'week': TruncWeek('date'),
+    'month': TruncMonth('date'),
+}
+GROUPS = {
+    'piece': ('task__piece', Piece),
+    'composer': ('task__piece__composers', Composer),
+    'style': ('task__piece__piece_information__styles', Style),
+}
+ROLLING_WINDOWS = [7, 30]
+
+
+def get_minutes(duration):
+    return int(duration.total_seconds() // 60) if duration else 0
+
+def aggregates():
+    return {
+        'time': Sum('time'),
+        'repetitions': Sum('repetitions'),
+        'sessions': Count('pk'),
+        'days': Count('date', distinct=True),
+    }
+
+def summarize(row):
+    return {
+        'minutes': get_minutes(row['time']),
+        'repetitions': float(row['repetitions'] or 0),
+        'sessions': row['sessions'],
+        'days': row['days'],
+    }
+
+def get_practices(user, start=None, end=None):
+    practices = Practice.objects.filter(task__user=user)
+    if start is not None:
+        practices = practices.filter(date__gte=start)
+    if end is not None:
+        practices = practices.filter(date__lte=end)
+    return practices
+
+def get_totals(practices, period='day'):
+    """
+    Return totals of every day, week or month with practices, grouped by the database.
+    Weeks are represented by their Monday and months by their first day.
+    """
+    rows = practices.order_by().annotate(period=PERIODS[period]).values('period').annotate(
+        **aggregates()
+    ).order_by('period')
+    return [{'period': row['period'], **summarize(row)} for row in rows]
+
+def get_rolling_averages(daily_totals, start, end, window=7):
+    """
+    Return average daily minutes over window days ending on every day from start to end.
+    Days without practice count as zero; at the beginning only days since start are averaged.
+    """
+    minutes = {total['period']: total['minutes'] for total in daily_totals}
+    values = [minutes.get(start + datetime.timedelta(days=day), 0) for day in range((end - start).days + 1)]
+    averages = []
+    window_sum = 0
+    for day, value in enumerate(values):
+        window_sum += value
+        if day >= window:
+            window_sum -= values[day - window]
+        averages.append({
+            'date': start + datetime.timedelta(days=day),
+            'minutes': round(window_sum / min(day + 1, window), 1),
+        })
+    return averages
+
+def get_streaks(dates, today=None):
+    """
+    Return the longest run of consecutive practice days with its first day and the current run,
+    which still lasts when the last practice was yesterday. Dates must be sorted and distinct.
+    """
+    today = today or timezone.localdate()
+    longest = current = 0
+    longest_start = current_start = previous = None
+    for date in dates:
+        if previous is not None and (date - previous).days == 1:
+            current += 1
+        else:
+            current = 1
+            current_start = date
+        if current > longest:
+            longest = current
+            longest_start = current_start
+        previous = date
+    if previous is None or (today - previous).days > 1:
+        current = 0
+    return {'longest': longest, 'longest_start': longest_start, 'current': current}
+
+def get_time_per(practices, group):
+    """
+    Return totals per piece, composer or style, most practiced first.
+    Practice of a piece with several composers or styles counts for each of them.
+    """
+    lookup, model = GROUPS[group]
+    rows = list(practices.filter(**{f'{lookup}__isnull': False}).order_by().values(lookup).annotate(**aggregates()))
+    objects = model.objects.in_bulk([row[lookup] for row in rows])
+    totals = [{'id': row[lookup], 'name': str(objects[row[lookup]]), **summarize(row)} for row in rows]
+    return sorted(totals, key=lambda total: (-total['minutes'], -total['sessions'], total['name']))
+
+def get_heatmap(practices):
+    """
+    Return minutes and number of practices for every weekday (rows from Monday) and starting hour (columns).
+    Practices without start time are skipped.
+    """
+    heatmap = [[{'minutes': 0, 'sessions': 0} for hour in range(24)] for weekday in range(7)]
+    rows = practices.filter(start_time__isnull=False).order_by().annotate(
+        weekday=ExtractIsoWeekDay('date'),
+        hour=ExtractHour('start_time'),
+    ).values('weekday', 'hour').annotate(time=Sum('time'), sessions=Count('pk'))
+    for row in rows:
+        heatmap[row['weekday'] - 1][row['hour']] = {'minutes': get_minutes(row['time']), 'sessions': row['sessions']}
+    return heatmap
+
+def get_practice_analytics(user, start=None, end=None, today=None):
+    """
+    Return practice totals, rolling averages, streaks, time per piece, composer and style
+    and time of day heatmap of user between optional start and end dates.
+    Everything is aggregated by grouped queries, without loading practices.
+    """
+    today = today or timezone.localdate()
+    practices = get_practices(user, start, end)
+    daily_totals = get_totals(practices, 'day')
+    rolling_averages = {}
+    if daily_totals:
+        rolling_start = start or daily_totals[0]['period']
+        rolling_end = end or max(today, daily_totals[-1]['period'])
+        rolling_averages = {
+            window: get_rolling_averages(daily_totals, rolling_start, rolling_end, window)
+            for window in ROLLING_WINDOWS
+        }
+    return {
+        'totals': {
+            'day': daily_totals,
+            'week': get_totals(practices, 'week'),
+            'month': get_totals(practices, 'month'),
+        },
+        'rolling_averages': rolling_averages,
+        'streaks': get_streaks([total['period'] for total in daily_totals], today),
+        'time_per': {group: get_time_per(practices, group) for group in GROUPS},
+        'heatmap': get_heatmap(practices),
+    }
@@ -0,0 +1,108 @@
+import statistics
+import time
+from django.conf import settings
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from accounts.permissions import is_owner_or_is_teacher
+from .analytics import get_practice_analytics
+from .models import Challenge
+
+BENCHMARKS = {}
+BENCHMARK_CACHE = getattr(settings, 'BENCHMARK_CACHE', {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'benchmark',
+})
+
+
+def benchmark(name):
+    """
+    Register function which prepares a benchmark for dataset and returns callable to be timed.
+    """
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+def view_callable(user, url):
+    """
+    Return callable calling the view of url as logged in user, without middleware.
+    """
+    def call():
+        request = RequestFactory().get(url)
+        request.user = user
+        request.session = SessionStore()
+        request.resolver_match = resolve(request.path_info)
+        response = request.resolver_match.func(request, *request.resolver_match.args, **request.resolver_match.kwargs)
+        assert response.status_code == 200, f"{url} returned {response.status_code}"
+        return response
+    return call
+
+@benchmark('year_calendar')
+def year_calendar(dataset):
+    student = dataset['students'][0]
+    return view_callable(student, reverse('tracker_calendar:year', args=[student.username, dataset['end_date'].year]))
+
+@benchmark('suggestions_list')
+def suggestions_list(dataset):
+    student = dataset['students'][0]
+    return view_callable(student, reverse('suggestions:list', args=[student.username]))
+
+@benchmark('task_list')
+def task_list(dataset):
+    student = dataset['students'][0]
+    return view_callable(student, reverse('tasks:list', args=[student.username]))
+
+@benchmark('search')
+def search(dataset):
+    student = dataset['students'][0]
+    return view_callable(student, reverse('tracker:search', args=[student.username]) + '?q=utw')
+
+@benchmark('practice_analytics')
+def practice_analytics(dataset):
+    student = dataset['students'][0]
+    return lambda: get_practice_analytics(student)
+
+@benchmark('challenge_checks')
+def challenge_checks(dataset):
+    return lambda: Challenge.objects.filter(user__in=dataset['students']).set_are_requirements_fulfilled()
+
+@benchmark('permission_checks')
+def permission_checks(dataset):
+    teacher = dataset['teachers'][0]
+    return lambda: [is_owner_or_is_teacher(teacher, student) for student in dataset['students']]
+
+
+def benchmark_cache():
+    """
+    Use a private cache of this process as the default cache, so clearing it doesn't clear the shared cache.
+    """
+    return override_settings(CACHES={**settings.CACHES, 'default': BENCHMARK_CACHE})
+
+def run_benchmark(func, repeats=5):
+    """
+    Time func repeats times with cold cache. Return query count of the last run and timings in milliseconds.
+    """
+    timings = []
+    with benchmark_cache():
+        for _ in range(repeats):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'queries': len(queries),
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+    }
+
+def run_benchmarks(dataset, names=None, repeats=5):
+    return {
+        name: run_benchmark(BENCHMARKS[name](dataset), repeats)
+        for name in (names or BENCHMARKS)
+    }
@@ -0,0 +1,37 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from .search import autocomplete, get_terms
+
+AUTOCOMPLETE_CACHE_TIMEOUT = getattr(settings, 'AUTOCOMPLETE_CACHE_TIMEOUT', 60)
+
+
+def autocomplete_version_cache_key(user_id):
+    return f"tracker:autocomplete_version:{user_id}"
+
+def autocomplete_cache_key(user_id, version, model_name, query):
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f"tracker:autocomplete:{user_id}:{version}:{model_name}:{digest}"
+
+def invalidate_autocomplete(user_id):
+    """
+    Drop all cached autocomplete results of user by changing the version stored in their keys.
+    """
+    key = autocomplete_version_cache_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+def get_autocomplete_results(user, model, query):
+    """
+    Return autocomplete results of user's objects of model, cached for a short time per user and normalized query.
+    """
+    version = cache.get_or_set(autocomplete_version_cache_key(user.pk), 0, None)
+    normalized_query = ' '.join(get_terms(query)).lower()
+    key = autocomplete_cache_key(user.pk, version, model._meta.model_name, normalized_query)
+    results = cache.get(key)
+    if results is None:
+        results = autocomplete(user, model, normalized_query)
+        cache.set(key, results, AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,110 @@
+import datetime
+import random
+from django.contrib.auth import get_user_model
+from accounts.models import Teacher, Student
+from suggestions.utils import update_suggested_tasks
+from .models import Goal, Piece, Part, Task, Practice, Challenge, TaskStats
+from .search import update_search_vectors
+
+UserModel = get_user_model()
+
+DATASET_SIZES = {
+    'small': {'teachers': 1, 'students_per_teacher': 3, 'pieces_per_student': 4, 'years': 1},
+    'medium': {'teachers': 2, 'students_per_teacher': 10, 'pieces_per_student': 8, 'years': 2},
+    'large': {'teachers': 5, 'students_per_teacher': 20, 'pieces_per_student': 12, 'years': 5},
+}
+
+
+def generate_dataset(teachers=1, students_per_teacher=3, pieces_per_student=4, parts_per_piece=3,
+                     tasks_per_piece=2, years=1, practices_per_day=2, end_date=None, seed=0, batch_size=2000,
+                     username_prefix='dataset'):
+    """
+    Create teachers with students who have pieces with parts, goals, tasks, challenges
+    and daily practices over given number of years, using bulk inserts.
+    Usernames start with username_prefix followed by seed.
+    Return dictionary with created teacher and student users, number of practices and end date.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or datetime.date.today()
+    start_date = end_date - datetime.timedelta(days=365 * years)
+    prefix = f'{username_prefix}{seed}'
+    teacher_users = UserModel.objects.bulk_create([
+        UserModel(username=f'{prefix}_teacher{t}', email=f'{prefix}_teacher{t}@example.com') for t in range(teachers)
+    ])
+    student_users = UserModel.objects.bulk_create([
+        UserModel(username=f'{prefix}_student{t}_{s}', email=f'{prefix}_student{t}_{s}@example.com')
+        for t in range(teachers) for s in range(students_per_teacher)
+    ])
+    teacher_objects = Teacher.objects.bulk_create([Teacher(user=user) for user in teacher_users])
+    student_objects = Student.objects.bulk_create([Student(user=user, is_student=True) for user in student_users])
+    Teacher.students.through.objects.bulk_create([
+        Teacher.students.through(teacher=teacher, student=student)
+        for t, teacher in enumerate(teacher_objects)
+        for student in student_objects[t * students_per_teacher:(t + 1) * students_per_teacher]
+    ])
+
+    pieces = Piece.objects.bulk_create([
+        Piece(user=user, name=f'Utwór {p}', name_to_display=f'Utwór {p}')
+        for user in student_users for p in range(pieces_per_student)
+    ])
+    goals = Goal.objects.bulk_create([
+        Goal(user=piece.user, name=f'Koncert - {piece.name}', date=start_date + datetime.timedelta(days=rng.randrange(365 * years + 1)))
+        for piece in pieces
+    ])
+    Piece.goals.through.objects.bulk_create([
+        Piece.goals.through(piece=piece, goal=goal) for piece, goal in zip(pieces, goals)
+    ])
+    parts = Part.objects.bulk_create([
+        Part(user=piece.user, piece=piece, name=f'Część {k}', order_number=k)
+        for piece in pieces for k in range(1, parts_per_piece + 1)
+    ])
+    for part in parts:
+        part.path = f"{part.pk}/"
+    Part.objects.bulk_update(parts, ['path'], batch_size=batch_size)
+    tasks = Task.objects.bulk_create([
+        Task(user=piece.user, piece=piece, goal=goal, element=f'Element {k}', method='Powoli', was_practiced=True)
+        for piece, goal in zip(pieces, goals) for k in range(tasks_per_piece)
+    ])
+    parts_by_piece = {}
+    for part in parts:
+        parts_by_piece.setdefault(part.piece_id, []).append(part)
+    Task.parts.through.objects.bulk_create([
+        Task.parts.through(task=task, part=rng.choice(parts_by_piece[task.piece_id]))
+        for task in tasks if parts_by_piece.get(task.piece_id)
+    ])
+    Challenge.objects.bulk_create([
+        Challenge(user=task.user, task=task, start_date=start_date, minimum_number_of_days=30,
+                  minimum_number_of_repetitions=5, minimum_total_repetitions=300)
+        for task in tasks[::tasks_per_piece]
+    ])
+
+    tasks_by_user = {}
+    for task in tasks:
+        tasks_by_user.setdefault(task.user_id, []).append(task)
+    practices = 0
+    batch = []
+    for day in range(365 * years + 1):
+        date = start_date + datetime.timedelta(days=day)
+        for user_tasks in tasks_by_user.values():
+            for task in rng.sample(user_tasks, min(practices_per_day, len(user_tasks))):
+                batch.append(Practice(
+                    task=task,
+                    date=date,
+                    repetitions=rng.randint(1, 20),
+                    time=datetime.timedelta(minutes=rng.randint(5, 60)),
+                    completion_percentage=rng.randint(0, 100),
+                ))
+        if len(batch) >= batch_size:
+            Practice.objects.bulk_create(batch)
+            practices += len(batch)
+            batch = []
+    Practice.objects.bulk_create(batch)
+    practices += len(batch)
+
+    user_tasks = Task.objects.filter(user__in=student_users)
+    TaskStats.rebuild(tasks=user_tasks)
+    update_suggested_tasks()
+    Challenge.objects.filter(user__in=student_users).set_are_requirements_fulfilled()
+    for model in [Goal, Piece, Task]:
+        update_search_vectors(model.objects.filter(user__in=student_users))
+    return {'teachers': teacher_users, 'students': student_users, 'practices': practices, 'end_date': end_date}
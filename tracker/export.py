@@ -0,0 +1,67 @@
+import csv
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Goal, Piece, Task, Practice, Challenge
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+EXPORT_FORMATS = ['csv', 'ndjson']
+EXPORT_CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORTED_MODELS = [Goal, Piece, Task, Practice, Challenge]
+# Derived from exported fields and rebuilt on save.
+EXCLUDED_FIELDS = ['search_vector']
+
+
+class Echo:
+    """
+    File-like object returning written value instead of buffering it, used by csv writer.
+    """
+    def write(self, value):
+        return value
+
+def get_fields(model):
+    return [field.attname for field in model._meta.concrete_fields if field.name not in EXCLUDED_FIELDS]
+
+def get_export_querysets(user):
+    """
+    Return model name and queryset of field values for every exported model of user.
+    """
+    for model in EXPORTED_MODELS:
+        user_lookup = 'task__user' if model is Practice else 'user'
+        queryset = model.objects.filter(**{user_lookup: user}).order_by('pk').values(*get_fields(model))
+        yield model._meta.model_name, queryset
+
+def iter_records(user, chunk_size=None):
+    """
+    Yield model name and values of every exported object of user, fetching rows in chunks.
+    """
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    for model_name, queryset in get_export_querysets(user):
+        for values in queryset.iterator(chunk_size=chunk_size):
+            yield model_name, values
+
+def iter_csv(user, chunk_size=None):
+    """
+    Yield CSV lines with a model column and a union of all exported fields.
+    """
+    columns = ['model']
+    for model in EXPORTED_MODELS:
+        columns += [field for field in get_fields(model) if field not in columns]
+    writer = csv.DictWriter(Echo(), fieldnames=columns)
+    yield writer.writeheader()
+    for model_name, values in iter_records(user, chunk_size):
+        yield writer.writerow({'model': model_name, **values})
+
+def iter_ndjson(user, chunk_size=None):
+    """
+    Yield one JSON object per line for every exported object.
+    """
+    for model_name, values in iter_records(user, chunk_size):
+        yield json.dumps({'model': model_name, **values}, cls=DjangoJSONEncoder) + "\n"
+
+def iter_export(user, export_format, chunk_size=None):
+    if export_format == 'csv':
+        return iter_csv(user, chunk_size)
+    if export_format == 'ndjson':
+        return iter_ndjson(user, chunk_size)
+    raise ValueError(f"Unknown export format: {export_format}")
@@ -1,24 +1,77 @@
+import datetime
 import factory
-from tracker.models import Goal, Piece
+from tracker.models import Goal, Piece, Part, Task, Practice, Challenge
+from accounts.models import Teacher, Student
 from django.contrib.auth import get_user_model
 
-UserModel = get_user_model
+UserModel = get_user_model()
 
 class UserFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = UserModel
+        django_get_or_create = ('username',)
 
-    username =  factory.Faker('word')
+    username = factory.Sequence(lambda n: f'user{n}')
     password = factory.Faker('password')
 
+class TeacherFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Teacher
+
+    user = factory.SubFactory(UserFactory)
+
+class StudentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Student
+
+    user = factory.SubFactory(UserFactory)
+    is_student = True
+
 class GoalFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Goal
 
+    user = factory.SubFactory(UserFactory)
     name = factory.Faker('sentence')
 
 class PieceFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Piece
 
-    name = factory.Faker('name')
\ No newline at end of file
+    user = factory.SubFactory(UserFactory)
+    name = factory.Faker('name')
+
+class PartFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Part
+
+    user = factory.SelfAttribute('piece.user')
+    piece = factory.SubFactory(PieceFactory)
+    name = factory.Sequence(lambda n: f'Część {n}')
+
+class TaskFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Task
+
+    user = factory.SelfAttribute('piece.user')
+    piece = factory.SubFactory(PieceFactory)
+    element = factory.Faker('word')
+    method = factory.Faker('word')
+
+class PracticeFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Practice
+
+    task = factory.SubFactory(TaskFactory)
+    date = factory.LazyFunction(datetime.date.today)
+    repetitions = factory.Faker('random_int', min=1, max=20)
+    time = factory.LazyFunction(lambda: datetime.timedelta(minutes=20))
+
+class ChallengeFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Challenge
+
+    user = factory.SelfAttribute('task.user')
+    task = factory.SubFactory(TaskFactory)
+    minimum_number_of_days = 10
+    minimum_total_repetitions = 100
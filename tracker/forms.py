@@ -1,12 +1,18 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.urls import reverse
 from .models import Piece, Goal, Composer, Style, PieceInformation
+from .widgets import AutocompleteSelectMultiple
+
+
+def set_autocomplete_url(field, user, model_name):
+    field.widget.url = reverse('tracker:autocomplete', args=[user.username, model_name])
 
 
 class GoalCreateForm(forms.Form):
     name = forms.CharField(max_length=200, label='Cel', required=False, empty_value='')
     piece = forms.CharField(max_length=200, label='Utwór', required=False, empty_value='')
-    pieces = forms.ModelMultipleChoiceField(queryset=Piece.objects.none(), label="Utwory", required=False, widget=forms.CheckboxSelectMultiple)
+    pieces = forms.ModelMultipleChoiceField(queryset=Piece.objects.none(), label="Utwory", required=False, widget=AutocompleteSelectMultiple)
     date = forms.DateField(required=False, label='Data')
     time = forms.TimeField(label="Godz.", required=False)
     additional_info = forms.CharField(label="Dodatkowe informacje", required=False)
@@ -16,6 +22,7 @@ class GoalCreateForm(forms.Form):
         super().__init__(*args, **kwargs)
         if user is not None:
             self.fields['pieces'].queryset = Piece.objects.filter(user=user)
+            set_autocomplete_url(self.fields['pieces'], user, 'piece')
 
     def clean(self):
         cleaned_data = super().clean()
@@ -32,7 +39,7 @@ class GoalCreateForm(forms.Form):
             self.add_error("additional_info", err)
 
 class GoalUpdateForm(forms.ModelForm):
-    pieces = forms.ModelMultipleChoiceField(queryset=Piece.objects.none(), label="Utwory", required=False, widget=forms.CheckboxSelectMultiple)
+    pieces = forms.ModelMultipleChoiceField(queryset=Piece.objects.none(), label="Utwory", required=False, widget=AutocompleteSelectMultiple)
 
     class Meta:
         model = Goal
@@ -45,6 +52,7 @@ class GoalUpdateForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if user is not None:
             self.fields['pieces'].queryset = Piece.objects.filter(user=user)
+            set_autocomplete_url(self.fields['pieces'], user, 'piece')
             self.fields['pieces'].initial = kwargs['instance'].pieces.all()
 
     def clean(self):
@@ -65,8 +73,8 @@ class PieceCreateForm(forms.ModelForm):
         use_required_attribute = False
         fields = ('name', 'composers', 'name_to_display', 'goals', 'is_mastered', 'is_archived', 'is_cleared')
         widgets = {
-            "composers": forms.CheckboxSelectMultiple(),
-            "goals": forms.CheckboxSelectMultiple()
+            "composers": AutocompleteSelectMultiple(),
+            "goals": AutocompleteSelectMultiple()
         }
 
     def __init__(self, *args, user=None, **kwargs):
@@ -74,6 +82,8 @@ class PieceCreateForm(forms.ModelForm):
         if user is not None:
             self.fields['composers'].queryset = Composer.objects.filter(user=user)
             self.fields['goals'].queryset = Goal.objects.filter(user=user)
+            set_autocomplete_url(self.fields['composers'], user, 'composer')
+            set_autocomplete_url(self.fields['goals'], user, 'goal')
 
     def clean(self):
         cleaned_data = super().clean()
@@ -0,0 +1,52 @@
+import json
+import subprocess
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from tracker.benchmarks import BENCHMARKS, benchmark_cache, run_benchmarks
+from tracker.datasets import DATASET_SIZES, generate_dataset
+
+
+def get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Time views and checks with query counts on synthetic datasets of several sizes. Data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', choices=DATASET_SIZES, default=['small', 'medium'])
+        parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=None)
+        parser.add_argument('--repeats', type=int, default=5)
+        parser.add_argument('--output', default=None, help="File to which results are appended as JSON lines.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed of random data, also used in usernames.")
+
+    def handle(self, *args, **options):
+        commit = get_commit()
+        results = []
+        for size in options['sizes']:
+            # Cache entries of rolled back data are left only in the private benchmark cache.
+            with benchmark_cache(), transaction.atomic():
+                dataset = generate_dataset(seed=options['seed'], username_prefix='benchmark', **DATASET_SIZES[size])
+                timings = run_benchmarks(dataset, options['benchmarks'], options['repeats'])
+                transaction.set_rollback(True)
+            for name, timing in timings.items():
+                results.append({
+                    'commit': commit,
+                    'date': timezone.now().isoformat(),
+                    'database': connection.vendor,
+                    'size': size,
+                    'practices': dataset['practices'],
+                    'benchmark': name,
+                    **timing,
+                })
+                self.stdout.write(
+                    f"{size:8} {name:20} {timing['queries']:>5} queries "
+                    f"{timing['min_ms']:>10.2f} ms min {timing['median_ms']:>10.2f} ms median"
+                )
+        if options['output']:
+            with open(options['output'], 'a', encoding='utf-8') as output:
+                output.writelines(json.dumps(result) + "\n" for result in results)
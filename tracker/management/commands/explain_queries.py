@@ -0,0 +1,40 @@
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from tracker.models import Goal, Practice, Task, Challenge
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN output of calendar, suggestions, task list and challenge list queries for given user."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--year', type=int, default=None, help="Calendar year, current year by default.")
+        parser.add_argument('--analyze', action='store_true', help="Run EXPLAIN ANALYZE (PostgreSQL only).")
+
+    def get_querysets(self, owner, year):
+        first_day = datetime.date(year, 1, 1)
+        last_day = datetime.date(year, 12, 31)
+        return {
+            'calendar goals': Goal.objects.filter(user=owner, date__range=(first_day, last_day)),
+            'calendar practice': Practice.objects.filter(task__user=owner, date__range=(first_day, last_day)),
+            'suggestions': Task.objects.filter(user=owner, are_suggestions_enabled=True, is_suggested=True),
+            'task list': Task.objects.filter(user=owner),
+            'challenge list': Challenge.objects.filter(user=owner).order_by('id'),
+        }
+
+    def handle(self, *args, **options):
+        try:
+            owner = UserModel.objects.get(username=options['username'])
+        except UserModel.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist.")
+        year = options['year'] or timezone.localdate(timezone.now()).year
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        for name, queryset in self.get_querysets(owner, year).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from tracker.export import EXPORT_FORMATS, iter_export
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Export goals, pieces, tasks, practices and challenges of a user as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', default=None, help="File to write to instead of standard output.")
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            user = UserModel.objects.get(username=options['username'])
+        except UserModel.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist.")
+        lines = iter_export(user, options['format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
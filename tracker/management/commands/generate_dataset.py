@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tracker.datasets import DATASET_SIZES, generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Create synthetic teachers and students with years of daily practices."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=DATASET_SIZES, default='small')
+        parser.add_argument('--seed', type=int, default=0, help="Seed of random data, also used in usernames.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            dataset = generate_dataset(seed=options['seed'], **DATASET_SIZES[options['size']])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(dataset['teachers'])} teachers, {len(dataset['students'])} students "
+            f"and {dataset['practices']} practices."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from tracker.search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute stored search vectors of goals, pieces, composers, collections and tasks (PostgreSQL only)."
+
+    def handle(self, *args, **options):
+        for model_name, updated in rebuild_search_vectors().items():
+            self.stdout.write(f"{model_name}: {updated}")
+        self.stdout.write(self.style.SUCCESS("Rebuilt search vectors."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from tracker.models import TaskStats
+
+
+class Command(BaseCommand):
+    help = "Recompute practice statistics of all tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuilt = TaskStats.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics of {rebuilt} tasks."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_alter_challenge_minimum_number_of_days_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['user', 'id'], name='challenge_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['user', 'date'], name='goal_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='practice',
+            index=models.Index(fields=['task', 'date'], name='practice_task_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'are_suggestions_enabled', 'is_suggested'], name='task_user_suggestions_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_suggested', True)), fields=['user'], name='task_user_suggested_idx'),
+        ),
+    ]
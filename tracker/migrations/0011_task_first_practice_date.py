@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_first_practice_date(apps, schema_editor):
+    Task = apps.get_model('tracker', 'Task')
+    Practice = apps.get_model('tracker', 'Practice')
+    first_practice = Practice.objects.filter(task=models.OuterRef('pk')).values('task').annotate(
+        first_practice_date=models.Min('date')
+    ).values('first_practice_date')
+    Task.objects.update(first_practice_date=models.Subquery(first_practice))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='first_practice_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['first_practice_date'], name='task_first_practice_date_idx'),
+        ),
+        migrations.RunPython(fill_first_practice_date, migrations.RunPython.noop),
+    ]
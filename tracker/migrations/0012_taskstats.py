@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_task_stats(apps, schema_editor):
+    Practice = apps.get_model('tracker', 'Practice')
+    TaskStats = apps.get_model('tracker', 'TaskStats')
+    rows = Practice.objects.order_by().values('task').annotate(
+        first_practice_date=models.Min('date'),
+        last_practice_date=models.Max('date'),
+        number_of_days=models.Count('date', distinct=True),
+        total_repetitions=Coalesce(models.Sum('repetitions'), models.Value(0), output_field=models.DecimalField(decimal_places=1, max_digits=12)),
+        total_time=models.Sum('time'),
+        average_completion_percentage=models.Avg('completion_percentage'),
+    )
+    TaskStats.objects.bulk_create((TaskStats(task_id=row.pop('task'), **row) for row in rows.iterator()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_task_first_practice_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStats',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='tracker.task')),
+                ('first_practice_date', models.DateField(blank=True, null=True)),
+                ('last_practice_date', models.DateField(blank=True, null=True)),
+                ('number_of_days', models.IntegerField(default=0)),
+                ('total_repetitions', models.DecimalField(decimal_places=1, default=0, max_digits=12)),
+                ('total_time', models.DurationField(blank=True, null=True)),
+                ('average_completion_percentage', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_task_stats, migrations.RunPython.noop),
+    ]
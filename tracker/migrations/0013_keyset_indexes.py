@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_taskstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_user_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['user', 'date', 'id'], name='goal_user_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='piece',
+            index=models.Index(fields=['user', 'id'], name='piece_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='style',
+            index=models.Index(fields=['user', 'id'], name='style_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'id'], name='task_user_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+def fill_part_paths(apps, schema_editor):
+    Part = apps.get_model('tracker', 'Part')
+    master_ids = dict(Part.objects.values_list('pk', 'master_part_id'))
+    paths = {}
+
+    def get_path(pk, visited=()):
+        if pk not in paths:
+            master_id = master_ids.get(pk)
+            if master_id is None or master_id in visited:
+                paths[pk] = f"{pk}/"
+            else:
+                paths[pk] = f"{get_path(master_id, visited + (pk,))}{pk}/"
+        return paths[pk]
+
+    parts = [Part(pk=pk, path=get_path(pk)) for pk in master_ids]
+    Part.objects.bulk_update(parts, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='part',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_part_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:25
+
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCHED_FIELDS = {
+    'goal': ('name', 'additional_info'),
+    'piece': ('name', 'name_to_display'),
+    'composer': ('names', 'surname', 'display_name'),
+    'collection': ('name',),
+    'task': ('element', 'method'),
+}
+
+
+def get_search_indexes():
+    # GIN indexes exist only on PostgreSQL, so they are created here instead of in models' Meta.
+    for model_name, fields in SEARCHED_FIELDS.items():
+        yield model_name, GinIndex(fields=['search_vector'], name=f'{model_name}_search_vector_idx')
+        for field in fields:
+            yield model_name, GinIndex(fields=[field], opclasses=['gin_trgm_ops'], name=f'{model_name}_{field}_trgm_idx')
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, fields in SEARCHED_FIELDS.items():
+        model = apps.get_model('tracker', model_name)
+        model.objects.update(search_vector=SearchVector(*fields, config='simple'))
+    for model_name, index in get_search_indexes():
+        schema_editor.add_index(apps.get_model('tracker', model_name), index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in get_search_indexes():
+        schema_editor.remove_index(apps.get_model('tracker', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_part_path'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='collection',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='composer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_search_vectors'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_first_practice_date_idx',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='first_practice_date',
+        ),
+        migrations.AddIndex(
+            model_name='taskstats',
+            index=models.Index(fields=['first_practice_date'], name='taskstats_first_practice_idx'),
+        ),
+    ]
@@ -1,9 +1,13 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Coalesce, Concat, Substr
 from django.conf import settings
 from django.shortcuts import reverse
 from django.utils import dateparse, timezone
 from django.core.mail import send_mail
 
+SUGGESTION_INTERVALS = [dateparse.parse_duration(f"{value} 00:00:00.000000") for value in [3, 4, 7, 28, 84]]
+
 class Goal(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=200, blank=True, default='')
@@ -11,10 +15,33 @@ class Goal(models.Model):
     time = models.TimeField(blank=True, null=True)
     is_concluded = models.BooleanField(default=False)
     additional_info = models.TextField(blank=True, default='')
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='goal_user_date_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name}{' - ' if self.date or self.time else ''}{self.date if self.date else ''}{', ' if self.date and self.time else ''}{self.time if self.time else ''}"
 
+class PieceQuerySet(models.QuerySet):
+    def for_display(self):
+        return self.select_related('user')
+
+    def with_details(self):
+        """
+        Load everything shown on piece's page: composers, goals, collections and additional information.
+        """
+        return self.for_display().select_related('piece_information').prefetch_related(
+            'composers',
+            'goals',
+            'collections',
+            'piece_information__types',
+            'piece_information__genres',
+            'piece_information__styles',
+        )
+
 class Piece(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     goals = models.ManyToManyField("Goal", blank=True, related_name="pieces")
@@ -25,6 +52,14 @@ class Piece(models.Model):
     is_mastered = models.BooleanField(default=False)
     is_archived = models.BooleanField(default=False)
     is_cleared = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PieceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='piece_user_id_idx'),
+        ]
 
     def __str__(self):
         return self.name_to_display if self.name_to_display else self.name
@@ -34,6 +69,7 @@ class Composer(models.Model):
     names = models.CharField(max_length=49, blank=True, default='')
     surname = models.CharField(max_length=30, blank=True, default='')
     display_name = models.CharField(max_length=80, blank=True, default='')
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.display_name if self.display_name else self.names + ' ' + self.surname
@@ -44,6 +80,7 @@ class Collection(models.Model):
     composer = models.ForeignKey("Composer", blank=True, null=True, on_delete=models.CASCADE)
     opus = models.CharField(max_length=10)
     pieces = models.ManyToManyField("Piece", blank=True, related_name="collections")
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.name
@@ -76,12 +113,30 @@ class Style(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     style = models.CharField(max_length=30, default='')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='style_user_id_idx'),
+        ]
+
     def get_absolute_url(self):
         return reverse('tracker:style_update', args=[self.user.username, self.pk])
 
     def __str__(self):
         return self.style
 
+class TaskQuerySet(models.QuerySet):
+    def for_display(self):
+        """
+        Load relations used by task's string representation and links.
+        """
+        return self.select_related('user', 'piece', 'goal')
+
+    def touching_subtree(self, part):
+        """
+        Tasks practicing part or any of its sub-parts.
+        """
+        return self.filter(parts__path__startswith=part.path).distinct()
+
 class Task(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     goal = models.ForeignKey("Goal", blank=True, null=True, on_delete=models.CASCADE)
@@ -92,32 +147,54 @@ class Task(models.Model):
     are_suggestions_enabled = models.BooleanField(default=True)
     is_suggested = models.BooleanField(default=False)
     was_practiced = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'are_suggestions_enabled', 'is_suggested'], name='task_user_suggestions_idx'),
+            models.Index(fields=['user', 'id'], name='task_user_id_idx'),
+            models.Index(fields=['user'], condition=models.Q(is_suggested=True), name='task_user_suggested_idx'),
+        ]
 
     def __str__(self):
         return f"{self.piece if self.piece else self.goal} -- {self.element if self.element else ''} -- {self.method if self.method else ''}"
 
     def timedeltas(self):
-        initial = [3, 4, 7, 28, 84]
-        return [dateparse.parse_duration(f"{value} 00:00:00.000000") for value in initial]
+        return SUGGESTION_INTERVALS
 
-    def set_is_suggested(self):
+    def set_is_suggested(self, first_practice_date):
         today = timezone.localdate(timezone.now())
-        practiced_at = self.practice_set.earliest('date').date
-        if today - practiced_at in self.timedeltas():
+        if first_practice_date is not None and today - first_practice_date in self.timedeltas():
             self.is_suggested = True
         else:
             self.is_suggested = False
 
+    def update_is_suggested(self):
+        # Statistics are refreshed on every practice save and delete, so they are read again instead of the cached ones.
+        first_practice_date = TaskStats.objects.filter(task_id=self.pk).values_list('first_practice_date', flat=True).first()
+        self.set_is_suggested(first_practice_date)
+
+    def get_suggestion_text(self):
+        last_practice_date = self.stats.last_practice_date if hasattr(self, 'stats') else None
+        if last_practice_date is None:
+            return f"You haven't practiced {self} yet."
+        return f"You practiced {self} at {last_practice_date}."
+
     def send_email_suggestion(self):
         if self.are_suggestions_enabled and hasattr(self.user, 'email'):
-            last_practice = self.practice_set.latest('date')
             send_mail(
                 "Practice suggestion",
-                f"You practiced {self.__str__()} at {last_practice}. Practice now!",
+                f"{self.get_suggestion_text()} Practice now!",
                 recipient_list=[f'{self.user.email}']
             )
 
 
+class PracticeQuerySet(models.QuerySet):
+    def for_display(self):
+        return self.select_related('task__user')
+
 class Practice(models.Model):
     task = models.ForeignKey("Task", on_delete=models.CASCADE)
     date = models.DateField()
@@ -129,9 +206,112 @@ class Practice(models.Model):
     is_completed = models.BooleanField(null=True)
     completion_percentage = models.IntegerField(blank=True, null=True)
 
+    objects = PracticeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'date'], name='practice_task_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.date}, {self.start_time if self.start_time else ''} {self.end_time if self.end_time else ''}"
 
+class TaskStats(models.Model):
+    task = models.OneToOneField("Task", on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    first_practice_date = models.DateField(blank=True, null=True)
+    last_practice_date = models.DateField(blank=True, null=True)
+    number_of_days = models.IntegerField(default=0)
+    total_repetitions = models.DecimalField(decimal_places=1, max_digits=12, default=0)
+    total_time = models.DurationField(blank=True, null=True)
+    average_completion_percentage = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['first_practice_date'], name='taskstats_first_practice_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.number_of_days} days, {self.total_repetitions} repetitions"
+
+    @staticmethod
+    def aggregates():
+        return {
+            'first_practice_date': models.Min('date'),
+            'last_practice_date': models.Max('date'),
+            'number_of_days': models.Count('date', distinct=True),
+            'total_repetitions': Coalesce(
+                models.Sum('repetitions'),
+                models.Value(0),
+                output_field=models.DecimalField(decimal_places=1, max_digits=12)
+            ),
+            'total_time': models.Sum('time'),
+            'average_completion_percentage': models.Avg('completion_percentage'),
+        }
+
+    @classmethod
+    def refresh(cls, task_id, create=True):
+        """
+        Recompute statistics of one task from its practices.
+        Without create only existing statistics are updated.
+        """
+        values = Practice.objects.filter(task_id=task_id).aggregate(**cls.aggregates())
+        if create:
+            return cls.objects.update_or_create(task_id=task_id, defaults=values)[0]
+        cls.objects.filter(task_id=task_id).update(**values)
+
+    @classmethod
+    def rebuild(cls, batch_size=1000, tasks=None):
+        """
+        Recompute statistics of all tasks, or only given ones, with one grouped query, upserting them in batches.
+        Return number of tasks with statistics.
+        """
+        practices = Practice.objects.all() if tasks is None else Practice.objects.filter(task__in=tasks)
+        rows = practices.order_by().values('task').annotate(**cls.aggregates()).values('task', *cls.aggregates())
+        fields = list(cls.aggregates())
+        rebuilt = 0
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(cls(task_id=row.pop('task'), **row))
+            if len(batch) >= batch_size:
+                cls.objects.bulk_create(batch, update_conflicts=True, unique_fields=['task'], update_fields=fields)
+                rebuilt += len(batch)
+                batch = []
+        if batch:
+            cls.objects.bulk_create(batch, update_conflicts=True, unique_fields=['task'], update_fields=fields)
+            rebuilt += len(batch)
+        stale = cls.objects.all() if tasks is None else cls.objects.filter(task__in=tasks)
+        stale.exclude(task__practice__isnull=False).delete()
+        return rebuilt
+
+class PartQuerySet(models.QuerySet):
+    def for_display(self):
+        return self.select_related('piece')
+
+    def subtree(self, part):
+        """
+        Part and all its sub-parts, on any level.
+        """
+        return self.filter(path__startswith=part.path)
+
+    def tree(self):
+        """
+        Load parts with one query and return root parts with sub-parts in children attribute,
+        ordered by order_number on every level. Parts whose master part isn't loaded are roots.
+        """
+        parts = {part.pk: part for part in self.order_by()}
+        roots = []
+        for part in parts.values():
+            part.children = []
+        for part in parts.values():
+            if part.master_part_id in parts:
+                parts[part.master_part_id].children.append(part)
+            else:
+                roots.append(part)
+        key = lambda part: (part.order_number is None, part.order_number or 0, part.pk)
+        for part in parts.values():
+            part.children.sort(key=key)
+        return sorted(roots, key=key)
+
 class Part(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=80, blank=True, default='')
@@ -139,10 +319,82 @@ class Part(models.Model):
     master_part = models.ForeignKey("self", blank=True, null=True, on_delete=models.SET_NULL, related_name="inside_parts")
     number_of_main_parts = models.IntegerField(blank=True, null=True)
     order_number = models.IntegerField(blank=True, null=True)
+    path = models.CharField(max_length=255, blank=True, default='', db_index=True, editable=False)
+
+    objects = PartQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.name if self.name else ''} {self.order_number if self.order_number else ''} - {self.piece if self.piece else ''}"
 
+    @property
+    def depth(self):
+        return self.path.count('/') - 1
+
+    def get_ancestor_ids(self):
+        return [int(pk) for pk in self.path.split('/')[:-2]]
+
+    def save(self, *args, **kwargs):
+        """
+        Save part and keep materialized path of ids from the root part, moving sub-parts with it.
+        """
+        master_path = ''
+        if self.master_part_id:
+            master_path = Part.objects.filter(pk=self.master_part_id).values_list('path', flat=True).get()
+            if self.path and master_path.startswith(self.path):
+                raise ValueError("Part can't be inside itself or its sub-part.")
+        super().save(*args, **kwargs)
+        path = f"{master_path}{self.pk}/"
+        if path != self.path:
+            previous_path = self.path
+            Part.objects.filter(pk=self.pk).update(path=path)
+            if previous_path:
+                Part.objects.filter(path__startswith=previous_path).exclude(pk=self.pk).update(
+                    path=Concat(models.Value(path), Substr('path', len(previous_path) + 1))
+                )
+            self.path = path
+
+class ChallengeQuerySet(models.QuerySet):
+    def for_display(self):
+        return self.select_related('user', 'task__piece', 'task__goal')
+
+    def with_progress(self):
+        """
+        Annotate number of practice days with enough repetitions and total repetitions of challenge's task.
+        Both are read from task statistics, only days of challenges with minimum number of repetitions
+        per day are counted from practices.
+        """
+        days_with_repetitions = Practice.objects.filter(
+            task=models.OuterRef('task'),
+            repetitions__gte=models.OuterRef('minimum_number_of_repetitions')
+        ).order_by().values('task').annotate(number_of_days=models.Count('date', distinct=True)).values('number_of_days')
+        return self.annotate(
+            number_of_days=Coalesce(
+                models.Case(
+                    models.When(minimum_number_of_repetitions__lte=0, then=models.F('task__stats__number_of_days')),
+                    default=models.Subquery(days_with_repetitions),
+                ),
+                models.Value(0),
+                output_field=models.IntegerField()
+            ),
+            total_repetitions=Coalesce(
+                models.F('task__stats__total_repetitions'),
+                models.Value(0),
+                output_field=models.DecimalField(decimal_places=1, max_digits=12)
+            )
+        )
+
+    def set_are_requirements_fulfilled(self):
+        """
+        Evaluate requirements of all challenges in one query and save changed ones with bulk_update.
+        """
+        challenges = list(self.select_related('task').with_progress())
+        changed = [
+            challenge for challenge in challenges
+            if challenge.are_requirements_fulfilled != challenge.set_are_requirements_fulfilled()
+        ]
+        Challenge.objects.bulk_update(changed, ['are_requirements_fulfilled'])
+        return challenges
+
 class Challenge(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     task = models.ForeignKey("Task", related_name="challenges", on_delete=models.CASCADE)
@@ -154,27 +406,37 @@ class Challenge(models.Model):
     are_requirements_fulfilled = models.BooleanField(default=False)
     is_completed = models.BooleanField(default=False)
 
+    objects = ChallengeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='challenge_user_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.task} - added: {self.start_date if self.start_date else self.date_added}"
 
+    def get_progress(self):
+        if not hasattr(self, 'number_of_days'):
+            progress = Challenge.objects.filter(pk=self.pk).with_progress().values('number_of_days', 'total_repetitions').get()
+            self.number_of_days = progress['number_of_days']
+            self.total_repetitions = progress['total_repetitions']
+        return self.number_of_days, self.total_repetitions
+
     def check_number_of_days(self):
         if self.task.was_practiced:
-            task = Task.objects.select_related('practice').get(task=self.task)
             if self.minimum_number_of_days <= 0:
                 return True
-            else:
-                required_repetitions = self.minimum_number_of_repetitions if self.minimum_number_of_repetitions >= 0 else 0
-                if self.minimum_number_of_days < len(task.practice_set.filter(repetitons__gte=required_repetitions).dates('date', 'day')):
-                    return True
+            number_of_days, total_repetitions = self.get_progress()
+            return self.minimum_number_of_days <= number_of_days
         return False
 
     def check_repetitions(self):
         if self.task.was_practiced:
             if self.minimum_total_repetitions <= 0:
                 return True
-            else:
-                total_repetitions = Practice.objects.filter(task=self.task).aggregate(total_repetitions=models.Sum("repetitions"))[0]
-                return self.minimum_total_repetitions <= total_repetitions
+            number_of_days, total_repetitions = self.get_progress()
+            return self.minimum_total_repetitions <= total_repetitions
         return False
 
     def check_if_fulfilled(self):
@@ -0,0 +1,144 @@
+import base64
+import binascii
+import json
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+
+
+class KeysetPage:
+    """
+    Page of objects following the cursor, with cursor of its last object if there are more objects.
+    """
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Seek pagination over an ordering ending with a unique field. Following pages are fetched
+    with a filter on the ordering values of the last seen object instead of an offset,
+    so deep pages cost as much as the first one when the ordering is indexed.
+    Nullable fields are ordered with nulls last.
+    """
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.per_page = per_page
+
+    def order_by(self):
+        return [
+            F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+            for field, descending in self.ordering
+        ]
+
+    def is_nullable(self, field):
+        return self.queryset.model._meta.get_field(field).null
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, field) for field, descending in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """
+        Return ordering values stored in cursor or raise ValueError if cursor is invalid.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        try:
+            return [
+                self.queryset.model._meta.get_field(field).to_python(value)
+                for (field, descending), value in zip(self.ordering, values)
+            ]
+        except ValidationError:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def seek_filter(self, values):
+        """
+        Build filter matching objects placed after given ordering values.
+        """
+        condition = None
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, values):
+            if value is None:
+                after = None
+                same = Q(**{f'{field}__isnull': True})
+            else:
+                after = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+                if self.is_nullable(field):
+                    after |= Q(**{f'{field}__isnull': True})
+                same = Q(**{field: value})
+            if after is not None:
+                condition = equal & after if condition is None else condition | (equal & after)
+            equal &= same
+        return condition
+
+    def get_page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.order_by())
+        if cursor:
+            condition = self.seek_filter(self.decode_cursor(cursor))
+            if condition is None:
+                return KeysetPage([])
+            queryset = queryset.filter(condition)
+        object_list = list(queryset[:self.per_page + 1])
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            return KeysetPage(object_list, self.encode_cursor(object_list[-1]))
+        return KeysetPage(object_list)
+
+
+class KeysetPaginationMixin:
+    """
+    Paginates owner's list from get_queryset with KeysetPaginator using "after" cursor from query string.
+    With format=json the page is returned as JSON for loading more objects.
+    """
+    keyset_ordering = ('id',)
+    per_page = 20
+    item_url_name = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'GET' and self.wants_json():
+            return self.load_more_response(self.paginate_keyset(self.get_queryset()))
+        return super().dispatch(request, *args, **kwargs)
+
+    def paginate_keyset(self, queryset):
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, self.per_page)
+        try:
+            return paginator.get_page(self.request.GET.get('after'))
+        except ValueError:
+            raise Http404
+
+    def wants_json(self):
+        return self.request.GET.get('format') == 'json'
+
+    def get_page_item(self, obj):
+        item = {'id': obj.pk, 'text': str(obj)}
+        if self.item_url_name:
+            item['url'] = reverse(self.item_url_name, args=[self.owner.username, obj.pk])
+        return item
+
+    def load_more_response(self, page):
+        return JsonResponse({
+            'results': [self.get_page_item(obj) for obj in page],
+            'next': page.next_cursor,
+        })
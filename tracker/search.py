@@ -0,0 +1,114 @@
+import re
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from .models import Goal, Piece, Composer, Collection, Task
+
+SEARCH_CONFIG = getattr(settings, 'SEARCH_CONFIG', 'simple')
+SEARCH_LIMIT = getattr(settings, 'SEARCH_LIMIT', 10)
+AUTOCOMPLETE_LIMIT = getattr(settings, 'AUTOCOMPLETE_LIMIT', 20)
+SEARCH_MAX_TERMS = 10
+SEARCHED_FIELDS = {
+    Goal: ('name', 'additional_info'),
+    Piece: ('name', 'name_to_display'),
+    Composer: ('names', 'surname', 'display_name'),
+    Collection: ('name',),
+    Task: ('element', 'method'),
+}
+
+
+def uses_full_text_search(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+def get_terms(query):
+    """
+    Split query into words, dropping punctuation so terms are safe to use in a raw tsquery.
+    """
+    return re.findall(r'[^\W_]+', query)[:SEARCH_MAX_TERMS]
+
+def search_vector(model):
+    return SearchVector(*SEARCHED_FIELDS[model], config=SEARCH_CONFIG)
+
+def update_search_vectors(queryset):
+    """
+    Recompute stored search vectors of objects in queryset. Search vectors are used only on PostgreSQL.
+    """
+    if uses_full_text_search(queryset):
+        return queryset.update(search_vector=search_vector(queryset.model))
+    return 0
+
+def rebuild_search_vectors(models=None):
+    return {model._meta.model_name: update_search_vectors(model.objects.all()) for model in models or SEARCHED_FIELDS}
+
+def prefix_query(terms):
+    return SearchQuery(' & '.join(f"{term}:*" for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+def full_text_search(queryset, terms):
+    """
+    Objects whose search vector contains all terms as word prefixes, best ranked first.
+    """
+    query = prefix_query(terms)
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', 'pk')
+
+def trigram_search(queryset, query):
+    """
+    Objects with a field containing a word similar to query, so misspelled queries still find something.
+    """
+    fields = SEARCHED_FIELDS[queryset.model]
+    similarities = [TrigramWordSimilarity(query, field) for field in fields]
+    condition = reduce(or_, [Q(**{f'{field}__trigram_word_similar': query}) for field in fields])
+    return queryset.filter(condition).annotate(
+        similarity=Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    ).order_by('-similarity', 'pk')
+
+def contains_search(queryset, terms):
+    """
+    Objects with every term contained in one of the searched fields, used on databases without full-text search.
+    """
+    fields = SEARCHED_FIELDS[queryset.model]
+    for term in terms:
+        queryset = queryset.filter(reduce(or_, [Q(**{f'{field}__icontains': term}) for field in fields]))
+    return queryset.order_by('pk')
+
+def search_model(model, user, query, limit=None):
+    """
+    Return up to limit user's objects of model matching query.
+    On PostgreSQL falls back to trigram similarity when full-text search finds nothing.
+    """
+    limit = limit or SEARCH_LIMIT
+    terms = get_terms(query)
+    if not terms:
+        return []
+    queryset = model.objects.filter(user=user).defer('search_vector')
+    if hasattr(queryset, 'for_display'):
+        queryset = queryset.for_display()
+    if not uses_full_text_search(queryset):
+        return list(contains_search(queryset, terms)[:limit])
+    return list(full_text_search(queryset, terms)[:limit]) or list(trigram_search(queryset, ' '.join(terms))[:limit])
+
+def search(user, query, limit=None, models=None):
+    """
+    Return results of searching user's objects grouped by model name.
+    """
+    return {
+        model._meta.model_name: search_model(model, user, query, limit)
+        for model in models or SEARCHED_FIELDS
+    }
+
+def autocomplete(user, model, query, limit=None):
+    """
+    Return ids and labels of user's objects of model for a picker: objects matching query as word prefixes,
+    or the most recently added objects when query is empty.
+    """
+    limit = limit or AUTOCOMPLETE_LIMIT
+    if get_terms(query):
+        objects = search_model(model, user, query, limit)
+    else:
+        objects = model.objects.filter(user=user).defer('search_vector').order_by('-pk')[:limit]
+    return [{'id': obj.pk, 'text': str(obj)} for obj in objects]
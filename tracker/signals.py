@@ -0,0 +1,46 @@
+from django.db.models import QuerySet
+from django.db.models.functions import Substr
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .models import Practice, TaskStats, Part, Goal, Piece, Composer
+from .cache import invalidate_autocomplete
+from .search import SEARCHED_FIELDS, update_search_vectors
+
+
+@receiver(post_save, sender=Practice)
+def refresh_task_stats(sender, instance, **kwargs):
+    TaskStats.refresh(instance.task_id)
+
+def get_origin_model(origin):
+    """
+    Return model of the object or queryset whose delete started the cascade.
+    """
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+@receiver(post_delete, sender=Practice)
+def refresh_deleted_practice_task_stats(sender, instance, origin=None, **kwargs):
+    # Practices are deleted by cascade only with their task, whose statistics are deleted too.
+    if get_origin_model(origin) is not Practice:
+        return
+    TaskStats.refresh(instance.task_id, create=False)
+
+@receiver(pre_delete, sender=Part)
+def detach_sub_parts(sender, instance, **kwargs):
+    # Sub-parts lose their master part (SET_NULL), so they become roots of their subtrees.
+    if instance.path:
+        Part.objects.filter(path__startswith=instance.path).exclude(pk=instance.pk).update(
+            path=Substr('path', len(instance.path) + 1)
+        )
+
+def update_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) & set(SEARCHED_FIELDS[sender]):
+        update_search_vectors(sender.objects.filter(pk=instance.pk))
+
+for model in SEARCHED_FIELDS:
+    post_save.connect(update_search_vector, sender=model, dispatch_uid=f'update_{model._meta.model_name}_search_vector')
+
+@receiver([post_save, post_delete], sender=Goal)
+@receiver([post_save, post_delete], sender=Piece)
+@receiver([post_save, post_delete], sender=Composer)
+def invalidate_user_autocomplete(sender, instance, **kwargs):
+    invalidate_autocomplete(instance.user_id)
@@ -0,0 +1,38 @@
+// Adds a search box to every select with data-autocomplete-url and loads its options while the user types.
+// Selected options are rendered by the server and are never removed.
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+        var input = document.createElement('input');
+        var timeout = null;
+        input.type = 'search';
+        input.placeholder = 'Szukaj...';
+        select.parentNode.insertBefore(input, select);
+
+        function load() {
+            var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(input.value);
+            fetch(url, {credentials: 'same-origin'})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    var selected = {};
+                    Array.from(select.options).forEach(function (option) {
+                        if (option.selected || option.value === '') {
+                            selected[option.value] = true;
+                        } else {
+                            option.remove();
+                        }
+                    });
+                    data.results.forEach(function (result) {
+                        if (!selected[result.id]) {
+                            select.add(new Option(result.text, result.id));
+                        }
+                    });
+                });
+        }
+
+        input.addEventListener('input', function () {
+            clearTimeout(timeout);
+            timeout = setTimeout(load, 200);
+        });
+        input.addEventListener('focus', load, {once: true});
+    });
+});
@@ -1,9 +1,22 @@
 from django.urls import reverse
 import pytest
 from pytest_django.asserts import assertTemplateUsed
-from tracker.models import Goal, Piece
+from tracker.models import Goal, Piece, Part, Task, Practice, TaskStats, Composer, Collection, PieceInformation, Style
+from tracker.benchmarks import BENCHMARKS
+from tracker.datasets import generate_dataset
+from tracker.factories import PracticeFactory, ChallengeFactory, StudentFactory, TeacherFactory
 from tracker.forms import GoalCreateForm, GoalUpdateForm
+from tracker.search import search, get_terms
+from tracker.analytics import get_practice_analytics
+import csv
 import datetime
+import json
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management.base import CommandError
 from django.contrib.auth import get_user_model
 
 UserModel = get_user_model()
@@ -209,4 +222,486 @@ def test_pieces_view_with_full_piece(client, piece, user):
     response = client.get(url)
     assert response.status_code == 200
     assert response.context['piece_list'].count() == 1
-    assert "Utwór opanowany" in response.content.decode('utf-8')
\ No newline at end of file
+    assert "Utwór opanowany" in response.content.decode('utf-8')
+
+@pytest.mark.django_db
+def test_explain_queries_command(user, goal):
+    """
+    Explain queries command prints query plan of every hot query.
+    """
+    out = StringIO()
+    call_command('explain_queries', user.username, '--year', '2025', stdout=out)
+    output = out.getvalue()
+    for name in ['calendar goals', 'calendar practice', 'suggestions', 'task list', 'challenge list']:
+        assert name in output
+
+@pytest.mark.django_db
+def test_explain_queries_command_with_non_existent_user():
+    """
+    Explain queries command fails for non-existent user.
+    """
+    with pytest.raises(CommandError):
+        call_command('explain_queries', 'nobody')
+
+@pytest.fixture
+def practiced_task(user, goal):
+    task = Task.objects.create(user=user, goal=goal, was_practiced=True)
+    Practice.objects.create(task=task, date='2025-08-12', repetitions=2, time=datetime.timedelta(minutes=10), completion_percentage=50)
+    Practice.objects.create(task=task, date='2025-08-12', repetitions=3, time=datetime.timedelta(minutes=20))
+    Practice.objects.create(task=task, date='2025-08-14', repetitions=1, completion_percentage=100)
+    return task
+
+@pytest.mark.django_db
+def test_task_stats_are_kept_up_to_date(practiced_task):
+    """
+    Task statistics are recomputed on every practice save and delete.
+    """
+    stats = TaskStats.objects.get(task=practiced_task)
+    assert stats.first_practice_date == datetime.date(2025, 8, 12)
+    assert stats.last_practice_date == datetime.date(2025, 8, 14)
+    assert stats.number_of_days == 2
+    assert stats.total_repetitions == 6
+    assert stats.total_time == datetime.timedelta(minutes=30)
+    assert stats.average_completion_percentage == 75
+    Practice.objects.get(date='2025-08-14').delete()
+    stats.refresh_from_db()
+    assert stats.last_practice_date == datetime.date(2025, 8, 12)
+    assert stats.number_of_days == 1
+
+@pytest.mark.django_db
+def test_task_with_stats_can_be_deleted(practiced_task):
+    """
+    Deleting task removes its practices and statistics.
+    """
+    practiced_task.delete()
+    assert not TaskStats.objects.exists()
+
+@pytest.mark.django_db
+def test_rebuild_task_stats_command(practiced_task):
+    """
+    Rebuild command recomputes statistics of all tasks from practices.
+    """
+    TaskStats.objects.all().delete()
+    Practice.objects.bulk_create([Practice(task=practiced_task, date='2025-08-20', repetitions=4)])
+    out = StringIO()
+    call_command('rebuild_task_stats', stdout=out)
+    stats = TaskStats.objects.get(task=practiced_task)
+    assert stats.number_of_days == 3
+    assert stats.total_repetitions == 10
+    assert 'Rebuilt statistics of 1 tasks.' in out.getvalue()
+
+@pytest.mark.django_db
+def test_deleting_task_doesnt_refresh_stats_of_each_practice(practiced_task):
+    """
+    Practices deleted with their task don't recompute statistics, which are deleted by the cascade.
+    """
+    task_id = practiced_task.pk
+    with CaptureQueriesContext(connection) as queries:
+        practiced_task.delete()
+    assert [query['sql'] for query in queries if 'tracker_taskstats' in query['sql']] == [
+        f'DELETE FROM "tracker_taskstats" WHERE "tracker_taskstats"."task_id" IN ({task_id})'
+    ]
+    assert not TaskStats.objects.exists()
+
+@pytest.mark.django_db
+def test_export_view_streams_csv(client, user, piece, practiced_task):
+    """
+    Export view streams all user's records as CSV with a model column.
+    """
+    client.force_login(user)
+    response = client.get(reverse('tracker:export', args=[user.username]))
+    assert response.streaming
+    assert response['Content-Disposition'] == 'attachment; filename="test-practice-log.csv"'
+    rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+    assert [row['model'] for row in rows] == ['goal', 'piece', 'task', 'practice', 'practice', 'practice']
+    assert rows[3]['date'] == '2025-08-12'
+    assert rows[3]['task_id'] == str(practiced_task.pk)
+
+@pytest.mark.django_db
+def test_export_view_streams_ndjson(client, user, practiced_task):
+    """
+    Export view streams one JSON object per line.
+    """
+    client.force_login(user)
+    response = client.get(reverse('tracker:export', args=[user.username]), {'format': 'ndjson'})
+    records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert len(records) == 5
+    assert records[-1] == {
+        'model': 'practice', 'id': records[-1]['id'], 'task_id': practiced_task.pk, 'date': '2025-08-14',
+        'time': None, 'start_time': None, 'end_time': None, 'repetitions': '1.0', 'is_summarized': None,
+        'is_completed': None, 'completion_percentage': 100,
+    }
+
+@pytest.mark.django_db
+def test_export_view_is_forbidden_for_other_users(client, user, user2):
+    """
+    Other users can't export user's practice log.
+    """
+    client.force_login(user2)
+    response = client.get(reverse('tracker:export', args=[user.username]))
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_export_practice_log_command(user, practiced_task, tmp_path):
+    """
+    Export command writes user's practice log to a file.
+    """
+    output = tmp_path / 'log.ndjson'
+    call_command('export_practice_log', user.username, '--format', 'ndjson', '--output', str(output), '--chunk-size', '1')
+    assert len(output.read_text().splitlines()) == 5
+
+@pytest.mark.django_db
+def test_goal_list_view_is_keyset_paginated(client, user):
+    """
+    Goal list pages follow (date, id) ordering with undated goals last and link to the next page.
+    """
+    Goal.objects.bulk_create(
+        [Goal(user=user, name=f'{i}', date=datetime.date(2025, 8, 1 + i % 3)) for i in range(22)]
+        + [Goal(user=user, name='bez daty') for i in range(3)]
+    )
+    client.force_login(user)
+    url = reverse('tracker:goal_list', args=[user.username])
+    seen = []
+    cursor = None
+    while True:
+        response = client.get(url, {'after': cursor} if cursor else {})
+        page = response.context['page_obj']
+        seen += [(goal.date or datetime.date.max, goal.pk) for goal in page]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+        assert f'?after={cursor}' in response.content.decode()
+    assert seen == sorted(seen)
+    assert len(seen) == 25
+    assert response.context['goal_list'].count() == 25
+
+@pytest.mark.django_db
+def test_piece_list_view_load_more_json(client, user):
+    """
+    Piece list returns page as JSON with cursor of the next page when asked for format=json.
+    """
+    pieces = Piece.objects.bulk_create([Piece(user=user, name=f'Etiuda {i}') for i in range(25)])
+    client.force_login(user)
+    url = reverse('tracker:piece_list', args=[user.username])
+    data = client.get(url, {'format': 'json'}).json()
+    assert [item['id'] for item in data['results']] == [piece.pk for piece in pieces[:20]]
+    assert data['results'][0] == {
+        'id': pieces[0].pk,
+        'text': 'Etiuda 0',
+        'url': reverse('tracker:piece_detail', args=[user.username, pieces[0].pk])
+    }
+    data = client.get(url, {'format': 'json', 'after': data['next']}).json()
+    assert len(data['results']) == 5
+    assert data['next'] is None
+
+@pytest.mark.django_db
+def test_list_view_with_invalid_cursor_returns_404(client, user):
+    """
+    Malformed cursor results in 404.
+    """
+    client.force_login(user)
+    response = client.get(reverse('tracker:goal_list', args=[user.username]), {'after': 'nonsense'})
+    assert response.status_code == 404
+
+@pytest.mark.django_db
+def test_load_more_json_requires_permission(client, user, user2):
+    """
+    Other users can't load pages of user's list.
+    """
+    client.force_login(user2)
+    response = client.get(reverse('tracker:style_list', args=[user.username]), {'format': 'json'})
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_piece_detail_view_max_queries(client, user, piece, assert_max_view_queries):
+    """
+    Piece detail view prefetches composers, goals, collections and additional information.
+    """
+    composers = Composer.objects.bulk_create([Composer(user=user, surname=f'{i}') for i in range(3)])
+    piece.composers.set(composers)
+    piece.goals.set(Goal.objects.bulk_create([Goal(user=user, name=f'{i}') for i in range(3)]))
+    information = PieceInformation.objects.create(piece=piece, opus='10')
+    information.styles.set(Style.objects.bulk_create([Style(user=user, style=f'{i}') for i in range(3)]))
+    movement = Part.objects.create(user=user, piece=piece, name='Allegro', order_number=1)
+    Part.objects.create(user=user, piece=piece, name='Ekspozycja', master_part=movement, order_number=1)
+    client.force_login(user)
+    response = assert_max_view_queries(reverse('tracker:piece_detail', args=[user.username, piece.pk]), 12)
+    assert 'opus: 10' in response.content.decode()
+    assert '1. Ekspozycja' in response.content.decode()
+
+@pytest.mark.django_db
+def test_piece_list_view_max_queries(client, user, assert_max_view_queries):
+    """
+    Piece list view renders in constant number of queries.
+    """
+    Piece.objects.bulk_create([Piece(user=user, name=f'{i}') for i in range(10)])
+    client.force_login(user)
+    assert_max_view_queries(reverse('tracker:piece_list', args=[user.username]), 5)
+
+@pytest.mark.django_db
+def test_generate_dataset():
+    """
+    Generated dataset has teachers with students, pieces with parts and daily practices.
+    """
+    dataset = generate_dataset(teachers=2, students_per_teacher=2, pieces_per_student=2, years=1, end_date=datetime.date(2025, 8, 12))
+    assert len(dataset['teachers']) == 2 and len(dataset['students']) == 4
+    assert dataset['teachers'][0].teacher.students.count() == 2
+    assert Part.objects.count() == 4 * 2 * 3
+    assert Practice.objects.count() == dataset['practices'] == 366 * 4 * 2
+    assert TaskStats.objects.count() == Task.objects.count() == 4 * 2 * 2
+    assert not TaskStats.objects.filter(first_practice_date__isnull=True).exists()
+
+@pytest.mark.django_db
+def test_benchmark_command_records_query_counts(tmp_path):
+    """
+    Benchmark command appends timings and query counts of every benchmark and rolls data back.
+    """
+    output = tmp_path / 'benchmarks.jsonl'
+    call_command('benchmark', '--sizes', 'small', '--repeats', '1', '--output', str(output), stdout=StringIO())
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [result['benchmark'] for result in results] == list(BENCHMARKS)
+    assert all(result['queries'] > 0 and result['size'] == 'small' for result in results)
+    assert not UserModel.objects.exists()
+
+@pytest.mark.django_db
+def test_benchmark_command_runs_next_to_generated_dataset():
+    """
+    Benchmark data doesn't collide with a generated dataset and benchmarks don't clear the shared cache.
+    """
+    call_command('generate_dataset', stdout=StringIO())
+    cache.set('kept', 1)
+    call_command('benchmark', '--sizes', 'small', '--benchmarks', 'task_list', '--repeats', '1', stdout=StringIO())
+    assert cache.get('kept') == 1
+    assert UserModel.objects.filter(username__startswith='dataset0_').exists()
+
+@pytest.mark.django_db
+def test_factories_create_related_objects():
+    """
+    Factories create practice and challenge of one user's task.
+    """
+    practice = PracticeFactory()
+    challenge = ChallengeFactory(task=practice.task)
+    assert practice.task.user == practice.task.piece.user == challenge.user
+    assert StudentFactory().user != TeacherFactory().user
+
+@pytest.fixture
+def part_tree(user, piece):
+    """
+    Two movements, the second one with two sections, the first of them with bars.
+    """
+    def part(name, order_number, master_part=None):
+        return Part.objects.create(user=user, piece=piece, name=name, order_number=order_number, master_part=master_part)
+    first = part('Allegro', 1)
+    second = part('Adagio', 2)
+    section_b = part('B', 2, second)
+    section_a = part('A', 1, second)
+    bars = part('Takty 1-8', 1, section_a)
+    return {'first': first, 'second': second, 'section_a': section_a, 'section_b': section_b, 'bars': bars}
+
+@pytest.mark.django_db
+def test_part_tree_is_loaded_with_one_query(piece, part_tree, django_assert_num_queries):
+    """
+    Tree of piece's parts is built from one query and ordered by order_number on every level.
+    """
+    with django_assert_num_queries(1):
+        roots = Part.objects.filter(piece=piece).tree()
+        assert [part.name for part in roots] == ['Allegro', 'Adagio']
+        assert [part.name for part in roots[1].children] == ['A', 'B']
+        assert [part.name for part in roots[1].children[0].children] == ['Takty 1-8']
+    assert part_tree['bars'].depth == 2
+    assert part_tree['bars'].get_ancestor_ids() == [part_tree['second'].pk, part_tree['section_a'].pk]
+
+@pytest.mark.django_db
+def test_tasks_touching_subtree(user, piece, part_tree):
+    """
+    Tasks of any sub-part of a movement are found with one subtree query.
+    """
+    bars_task = Task.objects.create(user=user, piece=piece)
+    bars_task.parts.add(part_tree['bars'], part_tree['section_b'])
+    first_movement_task = Task.objects.create(user=user, piece=piece)
+    first_movement_task.parts.add(part_tree['first'])
+    assert list(Task.objects.touching_subtree(part_tree['second'])) == [bars_task]
+    assert set(Part.objects.subtree(part_tree['section_a'])) == {part_tree['section_a'], part_tree['bars']}
+
+@pytest.mark.django_db
+def test_moving_part_moves_its_subtree(part_tree):
+    """
+    Changing master part updates paths of the part and all its sub-parts; cycles are rejected.
+    """
+    section_a = part_tree['section_a']
+    section_a.master_part = part_tree['first']
+    section_a.save()
+    part_tree['bars'].refresh_from_db()
+    assert part_tree['bars'].get_ancestor_ids() == [part_tree['first'].pk, section_a.pk]
+    assert set(Part.objects.subtree(part_tree['second'])) == {part_tree['second'], part_tree['section_b']}
+    part_tree['first'].master_part = part_tree['bars']
+    with pytest.raises(ValueError):
+        part_tree['first'].save()
+
+@pytest.mark.django_db
+def test_deleting_part_makes_sub_parts_roots(part_tree):
+    """
+    Sub-parts of deleted part become roots of their subtrees.
+    """
+    part_tree['second'].delete()
+    section_a = Part.objects.get(pk=part_tree['section_a'].pk)
+    bars = Part.objects.get(pk=part_tree['bars'].pk)
+    assert section_a.master_part is None and section_a.path == f"{section_a.pk}/"
+    assert bars.get_ancestor_ids() == [section_a.pk]
+
+@pytest.mark.django_db
+def test_search_finds_user_objects_matching_all_terms(user, user2, goal, piece):
+    """
+    Search matches every term against searched fields of user's objects only, ignoring case and punctuation.
+    """
+    composer = Composer.objects.create(user=user, names='Ludwig van', surname='Beethoven')
+    Collection.objects.create(user=user, name='Sonaty Beethovena', composer=composer, opus='2')
+    task = Task.objects.create(user=user, piece=piece, element='Kadencja', method='Powoli')
+    Piece.objects.create(user=user2, name='Beethoven - Sonata')
+    results = search(user, 'beethoven,')
+    assert results['piece'] == [piece]
+    assert results['composer'] == [composer]
+    assert [collection.name for collection in results['collection']] == ['Sonaty Beethovena']
+    assert results['goal'] == [] and results['task'] == []
+    assert search(user, 'kadencja powoli')['task'] == [task]
+    assert search(user, 'koncert moll')['piece'] == [piece]
+    assert get_terms('  --  ') == []
+
+@pytest.mark.django_db
+def test_search_view(client, user, goal, piece):
+    """
+    Search view groups results with links to detail pages and returns them as JSON with format=json.
+    """
+    client.force_login(user)
+    url = reverse('tracker:search', args=[user.username])
+    response = client.get(url, {'q': 'koncert'})
+    assertTemplateUsed(response, 'tracker/search.html')
+    assert reverse('tracker:piece_detail', args=[user.username, piece.pk]) in response.content.decode()
+    response = client.get(url, {'q': 'koncert', 'format': 'json'})
+    assert response.json()['results']['goal'] == [
+        {'id': goal.pk, 'text': str(goal), 'url': reverse('tracker:goal_detail', args=[user.username, goal.pk])}
+    ]
+    assert 'Nic nie znaleziono.' in client.get(url, {'q': 'sonata'}).content.decode()
+
+@pytest.mark.django_db
+def test_search_view_is_forbidden_for_other_users(client, user, user2):
+    """
+    Other users can't search user's objects.
+    """
+    client.force_login(user2)
+    response = client.get(reverse('tracker:search', args=[user.username]), {'q': 'koncert'})
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_search_view_queries(client, user, piece, assert_max_view_queries):
+    """
+    Search view makes one query per searched model.
+    """
+    Task.objects.create(user=user, piece=piece, element='Koncert')
+    client.force_login(user)
+    assert_max_view_queries(reverse('tracker:search', args=[user.username]), 9, q='koncert')
+
+@pytest.mark.django_db
+def test_autocomplete_view(client, user, user2, piece):
+    """
+    Autocomplete returns user's objects matching query word prefixes, or the latest ones for empty query.
+    """
+    sonata = Piece.objects.create(user=user, name='Sonata A-dur')
+    Piece.objects.create(user=user2, name='Sonata h-moll')
+    client.force_login(user)
+    url = reverse('tracker:autocomplete', args=[user.username, 'piece'])
+    assert client.get(url, {'q': 'son a'}).json() == {'results': [{'id': sonata.pk, 'text': 'Sonata A-dur'}]}
+    assert [result['id'] for result in client.get(url).json()['results']] == [sonata.pk, piece.pk]
+    assert client.get(reverse('tracker:autocomplete', args=[user.username, 'task'])).status_code == 404
+    client.force_login(user2)
+    assert client.get(url).status_code == 403
+
+@pytest.mark.django_db
+def test_autocomplete_results_are_cached_until_user_changes_objects(client, user, piece, django_assert_num_queries):
+    """
+    Repeated autocomplete queries are served from cache, which is invalidated when user saves a piece.
+    """
+    client.force_login(user)
+    url = reverse('tracker:autocomplete', args=[user.username, 'piece'])
+    client.get(url, {'q': 'koncert'})
+    with django_assert_num_queries(3):
+        client.get(url, {'q': 'Koncert '})
+    Piece.objects.create(user=user, name='Koncert e-moll')
+    assert len(client.get(url, {'q': 'koncert'}).json()['results']) == 2
+
+@pytest.mark.django_db
+def test_goal_update_form_renders_only_selected_pieces(user, goal, piece):
+    """
+    Pieces picker renders selected pieces only and loads the others from autocomplete url.
+    """
+    Piece.objects.create(user=user, name='Sonata A-dur')
+    goal.pieces.add(piece)
+    form = GoalUpdateForm(instance=goal, user=user)
+    html = str(form['pieces'])
+    assert piece.name in html and 'Sonata A-dur' not in html
+    assert reverse('tracker:autocomplete', args=[user.username, 'piece']) in html
+    assert 'tracker/autocomplete.js' in str(form.media)
+
+@pytest.fixture
+def analytics_task(user, piece):
+    composer = Composer.objects.create(user=user, surname='Beethoven', display_name='Beethoven')
+    style = Style.objects.create(user=user, style='Klasycyzm')
+    piece.composers.add(composer)
+    PieceInformation.objects.create(piece=piece).styles.add(style)
+    task = Task.objects.create(user=user, piece=piece)
+    for date, minutes, start_time in [
+        ('2025-08-11', 30, datetime.time(9, 30)),
+        ('2025-08-12', 10, None),
+        ('2025-08-13', 20, datetime.time(18)),
+        ('2025-09-01', 15, None),
+    ]:
+        Practice.objects.create(task=task, date=date, time=datetime.timedelta(minutes=minutes), repetitions=2, start_time=start_time)
+    return task
+
+@pytest.mark.django_db
+def test_practice_analytics(user, analytics_task):
+    """
+    Analytics group practices by day, week and month and compute rolling averages, streaks,
+    time per piece, composer and style and a weekday and hour heatmap.
+    """
+    analytics = get_practice_analytics(user, today=datetime.date(2025, 9, 2))
+    assert [(total['period'], total['minutes'], total['days']) for total in analytics['totals']['week']] == [
+        (datetime.date(2025, 8, 11), 60, 3), (datetime.date(2025, 9, 1), 15, 1),
+    ]
+    assert [(total['period'], total['repetitions']) for total in analytics['totals']['month']] == [
+        (datetime.date(2025, 8, 1), 6.0), (datetime.date(2025, 9, 1), 2.0),
+    ]
+    weekly_averages = {average['date']: average['minutes'] for average in analytics['rolling_averages'][7]}
+    assert weekly_averages[datetime.date(2025, 8, 13)] == 20.0
+    assert weekly_averages[datetime.date(2025, 8, 17)] == 8.6
+    assert weekly_averages[datetime.date(2025, 9, 2)] == 2.1
+    assert analytics['streaks'] == {'longest': 3, 'longest_start': datetime.date(2025, 8, 11), 'current': 1}
+    assert [(total['name'], total['minutes']) for group in ('piece', 'composer', 'style') for total in analytics['time_per'][group]] == [
+        ('L. van Beethoven - Koncert c-moll', 75), ('Beethoven', 75), ('Klasycyzm', 75),
+    ]
+    assert analytics['heatmap'][0][9] == {'minutes': 30, 'sessions': 1}
+    assert analytics['heatmap'][2][18] == {'minutes': 20, 'sessions': 1}
+    assert get_practice_analytics(user, start=datetime.date(2025, 9, 1))['totals']['day'][0]['minutes'] == 15
+
+@pytest.mark.django_db
+def test_practice_analytics_view(client, user, analytics_task, assert_max_view_queries):
+    """
+    Analytics page renders summaries with a bounded number of queries and returns everything as JSON with format=json.
+    """
+    client.force_login(user)
+    url = reverse('tracker:analytics', args=[user.username])
+    response = assert_max_view_queries(url, 14)
+    assertTemplateUsed(response, 'tracker/practice_analytics.html')
+    assert 'Najdłuższa seria: 3 dni' in response.content.decode()
+    data = client.get(url, {'format': 'json', 'end': '2025-08-31'}).json()
+    assert [total['period'] for total in data['totals']['month']] == ['2025-08-01']
+    assert client.get(url, {'start': '2025-13-01'}).status_code == 400
+
+@pytest.mark.django_db
+def test_practice_analytics_view_is_forbidden_for_other_users(client, user, user2):
+    """
+    Other users can't see user's practice analytics.
+    """
+    client.force_login(user2)
+    assert client.get(reverse('tracker:analytics', args=[user.username])).status_code == 403
@@ -17,4 +17,8 @@ urlpatterns = [
     path('<str:username>/styles/new', views.StyleCreateView.as_view(), name='style_create'),
     path('<str:username>/styles/<int:pk>/update', views.StyleUpdateView.as_view(), name='style_update'),
     path('<str:username>/styles/<int:pk>/delete', views.StyleDeleteView.as_view(), name='style_delete'),
+    path('<str:username>/search/', views.SearchView.as_view(), name='search'),
+    path('<str:username>/autocomplete/<str:model_name>/', views.AutocompleteView.as_view(), name='autocomplete'),
+    path('<str:username>/analytics/', views.PracticeAnalyticsView.as_view(), name='analytics'),
+    path('<str:username>/export/', views.ExportView.as_view(), name='export'),
 ]
\ No newline at end of file
@@ -1,52 +1,71 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Goal, Piece, PieceInformation, Style
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from .models import Goal, Piece, PieceInformation, Style, Part, Composer, Collection, Task
 from .forms import GoalCreateForm, GoalUpdateForm, PieceCreateForm, PieceInformationCreateForm
 from django.views.generic import ListView
 from django.views import View
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import UserPassesTestMixin
-from accounts.permissions import is_owner_or_is_teacher
+from accounts.permissions import OwnerPermissionMixin, is_owner_or_is_teacher
 from django.forms import modelform_factory
+from .export import EXPORT_CONTENT_TYPES, iter_export
+from .pagination import KeysetPaginationMixin
+from .search import search
+from .cache import get_autocomplete_results
+from .analytics import get_practice_analytics
 
 
 UserModel = get_user_model()
-
-class GoalListView(UserPassesTestMixin, ListView):
+SEARCH_GROUPS = [
+    (Goal, 'Cele', 'tracker:goal_detail'),
+    (Piece, 'Utwory', 'tracker:piece_detail'),
+    (Composer, 'Kompozytorzy', None),
+    (Collection, 'Zbiory', None),
+    (Task, 'Ćwiczenia', 'tasks:detail'),
+]
+AUTOCOMPLETE_MODELS = {'goal': Goal, 'piece': Piece, 'composer': Composer}
+WEEKDAY_NAMES = ['Pon', 'Wt', 'Śr', 'Czw', 'Pt', 'Sob', 'Ndz']
+
+class GoalListView(OwnerPermissionMixin, KeysetPaginationMixin, ListView):
     template_name = "tracker/goal_list.html"
     model = Goal
+    keyset_ordering = ('date', 'id')
+    item_url_name = 'tracker:goal_detail'
 
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get_queryset(self):
-        owner = get_object_or_404(UserModel, username=self.kwargs['username'])
+        owner = self.owner
         return Goal.objects.filter(user=owner)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['owner'] = get_object_or_404(UserModel, username=self.kwargs['username'])
+        context['owner'] = self.owner
+        context['page_obj'] = self.paginate_keyset(self.object_list)
         return context
 
-class GoalDetailView(UserPassesTestMixin, View):
+class GoalDetailView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = UserModel.objects.get(username=kwargs['username'])
+        owner = self.owner
         goal = get_object_or_404(Goal, pk=kwargs['pk'])
         return render(request, 'tracker/goal_detail.html', {'goal': goal, 'owner': owner})
 
-class GoalCreateView(UserPassesTestMixin, View):
+class GoalCreateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = UserModel.objects.get(username=kwargs['username'])
+        owner = self.owner
         form = GoalCreateForm(user=owner)
         return render(request, 'tracker/create_form.html', {'form': form, 'page_title': 'Dodaj cel', 'owner': owner})
 
     def post(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         form = GoalCreateForm(request.POST, user=owner)
         if form.is_valid():
             cleaned_data = form.cleaned_data
@@ -64,18 +83,18 @@ class GoalCreateView(UserPassesTestMixin, View):
             return redirect('tracker:goal_list', owner.username)
         return render(request, 'tracker/create_form.html', {'form': form, 'page_title': 'Dodaj cel', 'owner': owner})
 
-class GoalUpdateView(UserPassesTestMixin, View):
+class GoalUpdateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         goal = get_object_or_404(Goal, pk=kwargs['pk'])
         form = GoalUpdateForm(instance=goal, user=owner)
         return render(request, 'tracker/create_form.html', {'form': form, 'page_title': 'Zaktualizuj cel', 'owner': owner})
 
     def post (self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         goal = get_object_or_404(Goal, pk=kwargs['pk'])
         form = GoalUpdateForm(request.POST, user=owner, instance=goal)
         if form.is_valid():
@@ -86,12 +105,12 @@ class GoalUpdateView(UserPassesTestMixin, View):
             return redirect('tracker:goal_detail', owner.username, goal.pk)
         return render(request, 'tracker/create_form.html', {'form': form, 'page_title': 'Zaktualizuj cel', 'owner': owner})
 
-class GoalDeleteView(UserPassesTestMixin, View):
+class GoalDeleteView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, *args, **kwargs):
-        owner = get_object_or_404(UserModel, username=kwargs['username'])
+        owner = self.owner
         goal = get_object_or_404(Goal, pk=kwargs['pk'])
         return render(request, 'tracker/delete_form.html', {'object_to_delete': goal, 'owner':owner})
 
@@ -101,35 +120,46 @@ class GoalDeleteView(UserPassesTestMixin, View):
             goal.delete()
         return redirect('tracker:goal_list', kwargs['username'])
 
-class PieceListView(UserPassesTestMixin, View):
+class PieceListView(OwnerPermissionMixin, KeysetPaginationMixin, View):
+    item_url_name = 'tracker:piece_detail'
+
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
-    def get(self, request, username):
-        owner = get_object_or_404(UserModel, username=username)
-        queryset = Piece.objects.filter(user=owner)
-        return render(request, 'tracker/piece_list.html', {'piece_list': queryset, 'username': username, 'owner': owner})
+    def get_queryset(self):
+        return Piece.objects.filter(user=self.owner).for_display()
 
-class PieceDetailView(UserPassesTestMixin, View):
+    def get(self, request, username):
+        owner = self.owner
+        queryset = self.get_queryset()
+        return render(request, 'tracker/piece_list.html', {
+            'piece_list': queryset,
+            'page_obj': self.paginate_keyset(queryset),
+            'username': username,
+            'owner': owner
+        })
+
+class PieceDetailView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
-        piece = get_object_or_404(Piece, pk=pk)
-        return render(request, 'tracker/piece_detail.html', {'piece': piece, 'owner': owner})
+        owner = self.owner
+        piece = get_object_or_404(Piece.objects.with_details(), pk=pk)
+        parts = Part.objects.filter(piece=piece).tree()
+        return render(request, 'tracker/piece_detail.html', {'piece': piece, 'parts': parts, 'owner': owner})
 
-class PieceCreateView(UserPassesTestMixin, View):
+class PieceCreateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         forms = [PieceCreateForm(user=owner), PieceInformationCreateForm()]
         return render(request, 'tracker/piece_create.html', {'forms': forms, 'owner': owner})
 
     def post(self, request, username):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         piece_form = PieceCreateForm(request.POST, user=owner)
         piece_information_form = PieceInformationCreateForm(request.POST)
         if piece_form.is_valid():
@@ -148,12 +178,12 @@ class PieceCreateView(UserPassesTestMixin, View):
         forms = [piece_form, piece_information_form]
         return render(request, 'tracker/piece_create.html', {'forms': forms,  'owner': owner})
 
-class PieceUpdateView(UserPassesTestMixin, View):
+class PieceUpdateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         piece = get_object_or_404(Piece, pk=pk)
         piece_form = PieceCreateForm(instance=piece, user=owner)
         try:
@@ -166,7 +196,7 @@ class PieceUpdateView(UserPassesTestMixin, View):
         return render(request, 'tracker/piece_create.html', {'forms': forms, 'owner': owner})
 
     def post(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         piece = get_object_or_404(Piece, pk=pk)
         piece_form = PieceCreateForm(request.POST, instance=piece, user=owner)
         try:
@@ -190,12 +220,12 @@ class PieceUpdateView(UserPassesTestMixin, View):
         forms = [piece_form, piece_information_form]
         return render(request, 'tracker/piece_create.html', {'forms': forms, 'owner': owner})
 
-class PieceDeleteView(UserPassesTestMixin, View):
+class PieceDeleteView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         piece = get_object_or_404(Piece, pk=pk)
         return render(request, 'tracker/delete_form.html', {'object_to_delete': piece, 'owner': owner})
 
@@ -205,21 +235,23 @@ class PieceDeleteView(UserPassesTestMixin, View):
             goal.delete()
         return redirect('tracker:piece_list', username)
 
-class StyleListView(UserPassesTestMixin, ListView):
+class StyleListView(OwnerPermissionMixin, KeysetPaginationMixin, ListView):
     template_name = "tracker/basic_list.html"
     model = Style
     context_object_name = "object_list"
+    item_url_name = 'tracker:style_update'
 
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get_queryset(self):
-        owner = get_object_or_404(UserModel, username=self.kwargs['username'])
+        owner = self.owner
         return Style.objects.filter(user=owner)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['owner'] = get_object_or_404(UserModel, self.kwargs['username'])
+        context['owner'] = self.owner
+        context['page_obj'] = self.paginate_keyset(self.object_list)
         context['model_name'] = {
             'singular': 'styl',
             'plural': 'style'
@@ -230,17 +262,17 @@ class StyleListView(UserPassesTestMixin, ListView):
         }
         return context
 
-class StyleCreateView(UserPassesTestMixin, View):
+class StyleCreateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         StyleForm = modelform_factory(Style, fields=["style"], labels={"style": "Styl"})
         return render(request, 'tracker/create_form.html', {'form': StyleForm, 'owner': owner})
 
     def post(self, request, username):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         StyleForm = modelform_factory(Style, fields=["style"], labels={"style": "Styl"})
         form = StyleForm(request.POST)
         style = form.save(commit=False)
@@ -248,19 +280,19 @@ class StyleCreateView(UserPassesTestMixin, View):
         form.save()
         return redirect('tracker:style_list', username)
 
-class StyleUpdateView(UserPassesTestMixin, View):
+class StyleUpdateView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         style = get_object_or_404(Style, pk=pk)
         StyleForm = modelform_factory(Style, fields=["style"], labels={"style": "Styl"})
         form = StyleForm(instance=style)
         return render(request, 'tracker/create_form.html', {'form': form, 'owner': owner})
 
     def post(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         style = get_object_or_404(Style, pk=pk)
         StyleForm = modelform_factory(Style, fields=["style"], labels={"style": "Styl"})
         form = StyleForm(request.POST, instance=style)
@@ -269,11 +301,96 @@ class StyleUpdateView(UserPassesTestMixin, View):
         form.save()
         return redirect('tracker:style_list', username)
 
-class StyleDeleteView(UserPassesTestMixin, View):
+class StyleDeleteView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, pk):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         style = get_object_or_404(Style, pk=pk)
-        return render(request, 'tracker/delete_form.html', {'object_to_delete': style, 'owner': owner})
\ No newline at end of file
+        return render(request, 'tracker/delete_form.html', {'object_to_delete': style, 'owner': owner})
+
+class ExportView(OwnerPermissionMixin, View):
+    def test_func(self):
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get(self, request, *args, **kwargs):
+        owner = self.owner
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise Http404
+        response = StreamingHttpResponse(iter_export(owner, export_format), content_type=EXPORT_CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{owner.username}-practice-log.{export_format}"'
+        return response
+
+class SearchView(OwnerPermissionMixin, View):
+    def test_func(self):
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get_item(self, obj, url_name):
+        item = {'id': obj.pk, 'text': str(obj)}
+        if url_name:
+            item['url'] = reverse(url_name, args=[self.owner.username, obj.pk])
+        return item
+
+    def get(self, request, *args, **kwargs):
+        owner = self.owner
+        query = request.GET.get('q', '').strip()
+        results = search(owner, query, models=[model for model, title, url_name in SEARCH_GROUPS]) if query else {}
+        groups = [
+            {
+                'name': model._meta.model_name,
+                'title': title,
+                'results': [self.get_item(obj, url_name) for obj in results.get(model._meta.model_name, [])],
+            }
+            for model, title, url_name in SEARCH_GROUPS
+        ]
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'query': query, 'results': {group['name']: group['results'] for group in groups}})
+        return render(request, 'tracker/search.html', {
+            'owner': owner,
+            'query': query,
+            'groups': groups,
+            'has_results': any(group['results'] for group in groups),
+        })
+
+class AutocompleteView(OwnerPermissionMixin, View):
+    def test_func(self):
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get(self, request, *args, **kwargs):
+        model = AUTOCOMPLETE_MODELS.get(kwargs['model_name'])
+        if model is None:
+            raise Http404
+        return JsonResponse({'results': get_autocomplete_results(self.owner, model, request.GET.get('q', ''))})
+
+class PracticeAnalyticsView(OwnerPermissionMixin, View):
+    """
+    Practice totals, rolling averages, streaks, time per piece, composer and style and time of day heatmap
+    between optional start and end dates. With format=json everything is returned as JSON.
+    """
+    def test_func(self):
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get(self, request, *args, **kwargs):
+        owner = self.owner
+        try:
+            start, end = [parse_date(request.GET[key]) if request.GET.get(key) else None for key in ('start', 'end')]
+        except ValueError:
+            return HttpResponseBadRequest("Niepoprawna data.")
+        analytics = get_practice_analytics(owner, start, end)
+        if request.GET.get('format') == 'json':
+            return JsonResponse(analytics)
+        rolling_averages = {
+            window: averages[-1]['minutes'] for window, averages in analytics['rolling_averages'].items()
+        }
+        return render(request, 'tracker/practice_analytics.html', {
+            'owner': owner,
+            'start': start,
+            'end': end,
+            'analytics': analytics,
+            'recent_weeks': analytics['totals']['week'][-12:],
+            'rolling_averages': rolling_averages,
+            'heatmap': zip(WEEKDAY_NAMES, analytics['heatmap']),
+            'hours': range(24),
+        })
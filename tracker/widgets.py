@@ -0,0 +1,42 @@
+from django import forms
+
+
+class AutocompleteMixin:
+    """
+    Select rendering only the selected options of a model choice field.
+    Other options are loaded by tracker/autocomplete.js from url while the user types.
+    """
+    def __init__(self, attrs=None, choices=(), url=None):
+        super().__init__(attrs, choices)
+        self.url = url
+
+    class Media:
+        js = ['tracker/autocomplete.js']
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        if self.url:
+            attrs['data-autocomplete-url'] = self.url
+        return attrs
+
+    def get_selected_choices(self, value):
+        selected_pks = [str(pk) for pk in value if str(pk).isdigit()]
+        if not selected_pks:
+            return []
+        return [(obj.pk, str(obj)) for obj in self.choices.queryset.filter(pk__in=selected_pks)]
+
+    def optgroups(self, name, value, attrs=None):
+        options = []
+        if not self.is_required and not self.allow_multiple_selected:
+            options.append(self.create_option(name, '', '---------', not any(value), 0, attrs=attrs))
+        for option_value, option_label in self.get_selected_choices(value):
+            options.append(self.create_option(name, option_value, option_label, True, len(options), attrs=attrs))
+        return [(None, options, 0)]
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
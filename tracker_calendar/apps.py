@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TrackerCalendarConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker_calendar'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,55 @@
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.dateparse import parse_date
+
+CALENDAR_CACHE_TIMEOUT = getattr(settings, 'CALENDAR_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def month_cache_key(user_id, year, month, show_practice):
+    return f"tracker_calendar:month:{user_id}:{year}:{month}:{int(show_practice)}"
+
+def last_modified_cache_key(user_id):
+    return f"tracker_calendar:last_modified:{user_id}"
+
+def touch_calendar(user_id):
+    """
+    Move last modification of user's calendar to a later whole second than the previous one.
+    Last-Modified has a precision of one second, so a change made in the second of a previous
+    response must not keep the same value, otherwise If-Modified-Since would get 304 for stale data.
+    """
+    key = last_modified_cache_key(user_id)
+    now = math.ceil(time.time())
+    previous = cache.get(key)
+    if previous is None:
+        cache.set(key, now, CALENDAR_CACHE_TIMEOUT)
+        return
+    try:
+        cache.incr(key, max(1, now - previous))
+    except ValueError:
+        cache.set(key, max(now, previous + 1), CALENDAR_CACHE_TIMEOUT)
+
+def get_last_modified(user_id):
+    """
+    Return timestamp, in whole seconds, of the last change of user's goals or practices.
+    Goals and practices have no modification dates, so it is kept in cache by the calendar signals;
+    when it is missing, the current time is stored, which can only cause an unneeded full response.
+    """
+    key = last_modified_cache_key(user_id)
+    last_modified = cache.get(key)
+    if last_modified is None:
+        cache.add(key, math.ceil(time.time()), CALENDAR_CACHE_TIMEOUT)
+        last_modified = cache.get(key, math.ceil(time.time()))
+    return last_modified
+
+def invalidate_month(user_id, date):
+    touch_calendar(user_id)
+    if date is None:
+        return
+    if isinstance(date, str):
+        date = parse_date(date)
+    cache.delete_many([
+        month_cache_key(user_id, date.year, date.month, show_practice)
+        for show_practice in (True, False)
+    ])
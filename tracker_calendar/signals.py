@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from tracker.models import Goal, Practice, Task
+from tracker.signals import get_origin_model
+from .cache import invalidate_month
+
+
+@receiver(pre_save, sender=Goal)
+def invalidate_previous_goal_month(sender, instance, **kwargs):
+    if instance.pk:
+        previous = Goal.objects.filter(pk=instance.pk).values_list('user_id', 'date').first()
+        if previous:
+            invalidate_month(*previous)
+
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def invalidate_goal_month(sender, instance, **kwargs):
+    invalidate_month(instance.user_id, instance.date)
+
+@receiver(pre_save, sender=Practice)
+def invalidate_previous_practice_month(sender, instance, **kwargs):
+    if instance.pk:
+        previous = Practice.objects.filter(pk=instance.pk).values_list('task__user_id', 'date').first()
+        if previous:
+            invalidate_month(*previous)
+
+@receiver(post_save, sender=Practice)
+def invalidate_practice_month(sender, instance, **kwargs):
+    invalidate_month(instance.task.user_id, instance.date)
+
+@receiver(post_delete, sender=Practice)
+def invalidate_deleted_practice_month(sender, instance, origin=None, **kwargs):
+    # Months of practices deleted with their task are invalidated once for the task.
+    if get_origin_model(origin) is not Practice:
+        return
+    invalidate_month(instance.task.user_id, instance.date)
+
+@receiver(pre_delete, sender=Task)
+def invalidate_deleted_task_months(sender, instance, origin=None, **kwargs):
+    # Calendar of a deleted user is never shown again.
+    if get_origin_model(origin) is not get_user_model():
+        for date in Practice.objects.filter(task=instance).dates('date', 'month'):
+            invalidate_month(instance.user_id, date)
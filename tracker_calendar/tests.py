@@ -1,3 +1,259 @@
-from django.test import TestCase
+import pytest
+import datetime
+from django.core.cache import cache
+from django.urls import reverse
+from tracker.models import Goal, Practice
+from accounts.models import Teacher, Student
+from .utils import MyHTMLCalendar
+from .cache import month_cache_key
 
-# Create your tests here.
+
+@pytest.mark.django_db
+def test_year_view(client, user, logged):
+    """
+    Year view exists and provides correct template.
+    """
+    url = reverse('tracker_calendar:year', args=[user.username, 2025])
+    response = client.get(url)
+    assert response.status_code == 200
+    template_names = [t.name for t in response.templates if t.name is not None]
+    assert 'tracker_calendar/year_view.html' in template_names
+
+@pytest.mark.django_db
+def test_year_view_is_forbidden_for_other_user(client, user, user2):
+    """
+    User's year view is forbidden for other users.
+    """
+    client.force_login(user2)
+    url = reverse('tracker_calendar:year', args=[user.username, 2025])
+    response = client.get(url)
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_year_view_shows_goals_and_practices(client, user, logged, goal, goal_task_practice):
+    """
+    Year view shows goal and practice in their day cell.
+    """
+    url = reverse('tracker_calendar:year', args=[user.username, 2025])
+    response = client.get(url)
+    content = response.content.decode('utf-8')
+    day_url = reverse('tracker_calendar:day', args=[user.username, 2025, 8, 12])
+    assert f'<a href="{day_url}">12</a>{goal}{goal_task_practice}</td>' in content
+
+@pytest.mark.django_db
+def test_calendar_loads_year_in_constant_number_of_queries(user, goal_task, django_assert_num_queries):
+    """
+    Formatting a year runs one query for goals and one for practices, regardless of their number.
+    """
+    for day in range(1, 29):
+        Goal.objects.create(user=user, name="Cel", date=datetime.date(2025, 2, day))
+        Practice.objects.create(task=goal_task, date=datetime.date(2025, 3, day))
+    c = MyHTMLCalendar(goals=Goal.objects.filter(user=user), practice=Practice.objects.filter(task__user=user))
+    with django_assert_num_queries(2):
+        html_calendar = c.formatyear(2025)
+    assert html_calendar.count('Cel') == 28
+
+@pytest.mark.django_db
+def test_calendar_skips_entries_from_other_years(user, goal_task):
+    """
+    Calendar shows only entries from formatted year.
+    """
+    Goal.objects.create(user=user, name="Stary cel", date=datetime.date(2024, 5, 5))
+    c = MyHTMLCalendar(goals=Goal.objects.filter(user=user))
+    assert 'Stary cel' not in c.formatyear(2025)
+    assert 'Stary cel' in c.formatyear(2024)
+
+@pytest.mark.django_db
+def test_cached_calendar_year_renders_without_queries(user, goal, django_assert_num_queries):
+    """
+    Second render of the same year takes all months from cache.
+    """
+    MyHTMLCalendar(goals=Goal.objects.filter(user=user), owner=user).formatyear(2025)
+    c = MyHTMLCalendar(goals=Goal.objects.filter(user=user), owner=user)
+    with django_assert_num_queries(0):
+        html_calendar = c.formatyear(2025)
+    assert str(goal) in html_calendar
+
+@pytest.mark.django_db
+def test_saving_practice_invalidates_only_its_month(user, goal_task, goal_task_practice):
+    """
+    Saving practice re-renders its month, moving it to another month invalidates both.
+    """
+    c = MyHTMLCalendar(practice=Practice.objects.filter(task__user=user), owner=user, show_practice=True)
+    c.formatyear(2025)
+    goal_task_practice.date = datetime.date(2025, 10, 1)
+    goal_task_practice.save()
+    c = MyHTMLCalendar(practice=Practice.objects.filter(task__user=user), owner=user, show_practice=True)
+    formatted_months = c.formatmonths(2025)
+    assert c.loaded_range == (datetime.date(2025, 8, 1), datetime.date(2025, 10, 31))
+    assert str(goal_task_practice) not in formatted_months[8]
+    assert str(goal_task_practice) in formatted_months[10]
+
+@pytest.mark.django_db
+def test_deleting_task_invalidates_months_of_its_practices_once(user, goal_task, django_assert_max_num_queries):
+    """
+    Months of practices deleted with their task are invalidated without a query per practice.
+    """
+    Practice.objects.bulk_create([Practice(task=goal_task, date=datetime.date(2025, 8, 1 + day)) for day in range(30)])
+    Practice.objects.create(task=goal_task, date='2025-10-01')
+    MyHTMLCalendar(practice=Practice.objects.filter(task__user=user), owner=user, show_practice=True).formatyear(2025)
+    assert cache.get(month_cache_key(user.pk, 2025, 8, True)) is not None
+    with django_assert_max_num_queries(8):
+        goal_task.delete()
+    assert cache.get(month_cache_key(user.pk, 2025, 8, True)) is None
+    assert cache.get(month_cache_key(user.pk, 2025, 10, True)) is None
+    assert cache.get(month_cache_key(user.pk, 2025, 9, True)) is not None
+
+@pytest.mark.django_db
+def test_year_view_hides_practice_from_teacher_cache(client, user, user2, goal_task_practice):
+    """
+    Cached owner's months with practices are not shown to the teacher.
+    """
+    from accounts.models import Teacher, Student
+    teacher = Teacher.objects.create(user=user2)
+    teacher.students.add(Student.objects.create(user=user))
+    url = reverse('tracker_calendar:year', args=[user.username, 2025])
+    client.force_login(user)
+    assert str(goal_task_practice) in client.get(url).content.decode('utf-8')
+    client.force_login(user2)
+    assert str(goal_task_practice) not in client.get(url).content.decode('utf-8')
+
+@pytest.mark.django_db
+def test_month_view_shows_only_its_month(client, user, logged, goal, django_assert_max_num_queries):
+    """
+    Month view provides correct template and shows only goals from requested month.
+    """
+    Goal.objects.create(user=user, name="Wrzesień", date=datetime.date(2025, 9, 1))
+    url = reverse('tracker_calendar:month', args=[user.username, 2025, 8])
+    with django_assert_max_num_queries(8):
+        response = client.get(url)
+    assert response.status_code == 200
+    template_names = [t.name for t in response.templates if t.name is not None]
+    assert 'tracker_calendar/month_view.html' in template_names
+    content = response.content.decode('utf-8')
+    assert str(goal) in content
+    assert 'Wrzesień' not in content
+    assert response.context['previous'] == (2025, 7)
+    assert response.context['next'] == (2025, 9)
+
+@pytest.mark.django_db
+def test_month_view_returns_404_with_invalid_month(client, user, logged):
+    """
+    Month view returns 404 when month doesn't exist.
+    """
+    url = reverse('tracker_calendar:month', args=[user.username, 2025, 13])
+    response = client.get(url)
+    assert response.status_code == 404
+
+@pytest.mark.django_db
+def test_week_view_shows_whole_iso_week(client, user, logged, goal, goal_task):
+    """
+    Week view shows entries from all days of the ISO week, also across months.
+    """
+    practice = Practice.objects.create(task=goal_task, date=datetime.date(2025, 9, 1))
+    Goal.objects.create(user=user, name="Inny tydzień", date=datetime.date(2025, 8, 10))
+    url = reverse('tracker_calendar:week', args=[user.username, 2025, 33])
+    response = client.get(url)
+    assert response.status_code == 200
+    content = response.content.decode('utf-8')
+    assert str(goal) in content
+    assert 'Inny tydzień' not in content
+    url = reverse('tracker_calendar:week', args=[user.username, 2025, 36])
+    assert str(practice) in client.get(url).content.decode('utf-8')
+
+@pytest.mark.django_db
+def test_week_view_returns_404_with_invalid_week(client, user, logged):
+    """
+    Week view returns 404 when week doesn't exist.
+    """
+    url = reverse('tracker_calendar:week', args=[user.username, 2025, 54])
+    response = client.get(url)
+    assert response.status_code == 404
+
+@pytest.mark.django_db
+def test_week_view_is_forbidden_for_other_user(client, user, user2):
+    """
+    User's week view is forbidden for other users.
+    """
+    client.force_login(user2)
+    url = reverse('tracker_calendar:week', args=[user.username, 2025, 33])
+    response = client.get(url)
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_day_view_max_queries(user, logged, goal, goal_task, assert_max_view_queries):
+    """
+    Day view lists goals and practices in constant number of queries.
+    """
+    Practice.objects.bulk_create([Practice(task=goal_task, date='2025-08-12') for _ in range(5)])
+    Goal.objects.bulk_create([Goal(user=user, date='2025-08-12') for _ in range(5)])
+    assert_max_view_queries(reverse('tracker_calendar:day', args=[user.username, 2025, 8, 12]), 6)
+
+@pytest.mark.django_db
+def test_calendar_data_view(user, logged, client, goal_task):
+    """
+    Calendar data contains goals and practice summaries of days in range.
+    """
+    Practice.objects.create(task=goal_task, date='2025-08-12', repetitions=2, time=datetime.timedelta(minutes=20))
+    Practice.objects.create(task=goal_task, date='2025-08-12', repetitions=3, time=datetime.timedelta(minutes=10))
+    Practice.objects.create(task=goal_task, date='2025-08-20')
+    url = reverse('tracker_calendar:data', args=[user.username])
+    response = client.get(url, {'start': '2025-08-01', 'end': '2025-08-15'})
+    assert response.json() == {
+        'start': '2025-08-01',
+        'end': '2025-08-15',
+        'days': {'2025-08-12': {'goals': ['Koncert'], 'practices': {'count': 2, 'repetitions': 5.0, 'minutes': 30}}},
+    }
+    assert response['ETag'] and response['Last-Modified']
+
+@pytest.mark.django_db
+def test_calendar_data_view_conditional_get(user, logged, client, goal_task):
+    """
+    Unchanged calendar is answered with 304 until a goal or practice changes.
+    """
+    url = reverse('tracker_calendar:data', args=[user.username])
+    response = client.get(url)
+    etag = response['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 304
+    practice = Practice.objects.create(task=goal_task, date='2025-08-12')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    etag = response['ETag']
+    practice.delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+@pytest.mark.django_db
+def test_calendar_data_view_last_modified_changes_within_a_second(user, logged, client, goal_task, monkeypatch):
+    """
+    Change made in the same second as the previous response moves Last-Modified, so If-Modified-Since doesn't get 304.
+    """
+    monkeypatch.setattr('tracker_calendar.cache.time.time', lambda: 1755000000.2)
+    url = reverse('tracker_calendar:data', args=[user.username])
+    last_modified = client.get(url)['Last-Modified']
+    Practice.objects.create(task=goal_task, date='2025-08-12')
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200
+    assert response['Last-Modified'] != last_modified
+
+@pytest.mark.django_db
+def test_calendar_data_view_hides_practice_from_teacher(user, user2, client, goal_task):
+    """
+    Teachers see goals but not practices of their students.
+    """
+    Practice.objects.create(task=goal_task, date='2025-08-12')
+    teacher = Teacher.objects.create(user=user2)
+    teacher.students.add(Student.objects.create(user=user))
+    client.force_login(user2)
+    response = client.get(reverse('tracker_calendar:data', args=[user.username]), {'start': '2025-08-01', 'end': '2025-08-31'})
+    assert response.json()['days'] == {'2025-08-12': {'goals': ['Koncert']}}
+
+@pytest.mark.django_db
+def test_calendar_data_view_rejects_invalid_range(user, logged, client):
+    """
+    Invalid dates and too long ranges are rejected.
+    """
+    url = reverse('tracker_calendar:data', args=[user.username])
+    assert client.get(url, {'start': 'wczoraj'}).status_code == 400
+    assert client.get(url, {'start': '2025-02-30'}).status_code == 400
+    assert client.get(url, {'start': '2024-01-01', 'end': '2025-12-31'}).status_code == 400
@@ -4,6 +4,9 @@ from . import views
 app_name = 'tracker_calendar'
 
 urlpatterns = [
+    path('<str:username>/calendar.json', views.CalendarDataView.as_view(), name='data'),
     path('<str:username>/<int:year>/', views.YearView.as_view(), name='year'),
+    path('<str:username>/<int:year>/<int:month>/', views.MonthView.as_view(), name='month'),
+    path('<str:username>/<int:year>/week/<int:week>/', views.WeekView.as_view(), name='week'),
     path('<str:username>/<int:year>/<int:month>/<int:day>', views.DayView.as_view(), name='day')
 ]
\ No newline at end of file
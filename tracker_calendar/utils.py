@@ -1,26 +1,43 @@
 import calendar
 import datetime
+from collections import defaultdict
+from django.core.cache import cache
+from django.urls import reverse
 from tracker.models import Goal, Practice
+from .cache import month_cache_key, CALENDAR_CACHE_TIMEOUT
 
 mdays = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 
 
 class MyHTMLCalendar(calendar.LocaleHTMLCalendar):
-    def __init__(self, goals=None, practice=None):
+    def __init__(self, goals=None, practice=None, owner=None, show_practice=False):
         super().__init__()
-        self.goals = goals or Goal.objects.none()
-        self.practice = practice or Practice.objects.none()
+        self.owner = owner
+        self.show_practice = show_practice
+        self.goals = goals if goals is not None else Goal.objects.none()
+        self.practice = practice if practice is not None else Practice.objects.none()
+        self.entries = defaultdict(list)
+        self.loaded_range = None
+
+    def load_entries(self, start_date, end_date):
+        """
+        Bucket goals and practices between start_date and end_date (inclusive) by date,
+        using one query for each of them.
+        """
+        entries = defaultdict(list)
+        for goal in self.goals.filter(date__range=(start_date, end_date)).order_by('date', 'pk'):
+            entries[goal.date].append(goal)
+        for practice in self.practice.filter(date__range=(start_date, end_date)).order_by('date', 'pk'):
+            entries[practice.date].append(practice)
+        self.entries = entries
+        self.loaded_range = (start_date, end_date)
+
+    def is_loaded(self, start_date, end_date):
+        return self.loaded_range is not None and self.loaded_range[0] <= start_date and end_date <= self.loaded_range[1]
 
     def add_tasks(self, y, m, d):
         current_day = datetime.date(year=y, month=m, day=d)
-        goals_filtered = self.goals.filter(date=current_day)
-        practices_filtered = self.practice.filter(date=current_day)
-        result = ''
-        for goal in goals_filtered:
-            result += str(goal)
-        for practice in practices_filtered:
-            result += str(practice)
-        return result
+        return ''.join(str(entry) for entry in self.entries.get(current_day, []))
 
     @staticmethod
     def monthlen(year, month):
@@ -73,11 +90,16 @@ class MyHTMLCalendar(calendar.LocaleHTMLCalendar):
         """
         return self.itermonthdays6(year, month)
 
+    def day_url(self, y, m, d):
+        if self.owner is not None:
+            return reverse('tracker_calendar:day', args=[self.owner.username, y, m, d])
+        return f"{m}/{d}"
+
     def formatday(self, d, m, y, wd):
         if d == 0:
             return '<td class="%s">&nbsp;</td>' % self.cssclass_noday
         else:
-            return f'<td class="{self.cssclasses[wd]}"><a href="{m}/{d}">{d}</a>{self.add_tasks(y, m, d)}</td>'
+            return f'<td class="{self.cssclasses[wd]}"><a href="{self.day_url(y, m, d)}">{d}</a>{self.add_tasks(y, m, d)}</td>'
 
     def formatweek(self, theweek):
         """
@@ -91,6 +113,10 @@ class MyHTMLCalendar(calendar.LocaleHTMLCalendar):
         Same as calendar.HTMLCalendar.formatmonth, with removed newlines
         Return a formatted month as a table.
         """
+        first_day = datetime.date(theyear, themonth, 1)
+        last_day = datetime.date(theyear, themonth, self.monthlen(theyear, themonth))
+        if not self.is_loaded(first_day, last_day):
+            self.load_entries(first_day, last_day)
         v = []
         a = v.append
         a('<table border="0" cellpadding="0" cellspacing="0" class="%s">' % (
@@ -102,11 +128,67 @@ class MyHTMLCalendar(calendar.LocaleHTMLCalendar):
         a('</table>')
         return ''.join(v)
 
+    def iterisoweekdays(self, isoyear, week):
+        """
+        Yield (year, month, day, weekday) tuples of the ISO week, like itermonthdays6().
+        """
+        monday = datetime.date.fromisocalendar(isoyear, week, 1)
+        for i in range(7):
+            day = monday + datetime.timedelta(days=i)
+            yield day.year, day.month, day.day, day.weekday()
+
+    def formatisoweek(self, isoyear, week):
+        """
+        Return a formatted ISO week as a table.
+        """
+        days = list(self.iterisoweekdays(isoyear, week))
+        first_day = datetime.date(*days[0][:3])
+        last_day = datetime.date(*days[-1][:3])
+        if not self.is_loaded(first_day, last_day):
+            self.load_entries(first_day, last_day)
+        v = []
+        a = v.append
+        a('<table border="0" cellpadding="0" cellspacing="0" class="%s">' % (
+            self.cssclass_month))
+        a('<tr><th colspan="7" class="%s">%s - %s</th></tr>' % (
+            self.cssclass_month_head, first_day, last_day))
+        a(self.formatweekheader())
+        a(self.formatweek(days))
+        a('</table>')
+        return ''.join(v)
+
+    def formatmonths(self, theyear):
+        """
+        Return a dict of all months of the year formatted without year.
+        When owner is given, months are taken from cache and only missing ones are rendered.
+        """
+        if self.owner is not None:
+            keys = {
+                m: month_cache_key(self.owner.pk, theyear, m, self.show_practice)
+                for m in range(calendar.JANUARY, calendar.JANUARY+12)
+            }
+            cached = cache.get_many(keys.values())
+        else:
+            keys, cached = {}, {}
+        formatted_months = {m: cached[key] for m, key in keys.items() if key in cached}
+        missing = [m for m in range(calendar.JANUARY, calendar.JANUARY+12) if m not in formatted_months]
+        if missing:
+            first_day = datetime.date(theyear, missing[0], 1)
+            last_day = datetime.date(theyear, missing[-1], self.monthlen(theyear, missing[-1]))
+            if not self.is_loaded(first_day, last_day):
+                self.load_entries(first_day, last_day)
+            for m in missing:
+                formatted_months[m] = self.formatmonth(theyear, m, withyear=False)
+            if keys:
+                cache.set_many({keys[m]: formatted_months[m] for m in missing}, CALENDAR_CACHE_TIMEOUT)
+        return formatted_months
+
     def formatyear(self, theyear, width=3):
         """
         Same as calendar.HTMLCalendar.formatyear, with removed newlines
         Return a formatted year as a table of tables.
         """
+        formatted_months = self.formatmonths(theyear)
         v = []
         a = v.append
         width = max(width, 1)
@@ -120,7 +202,7 @@ class MyHTMLCalendar(calendar.LocaleHTMLCalendar):
             a('<tr>')
             for m in months:
                 a('<td>')
-                a(self.formatmonth(theyear, m, withyear=False))
+                a(formatted_months[m])
                 a('</td>')
             a('</tr>')
         a('</table>')
@@ -1,36 +1,87 @@
-from django.shortcuts import render, get_object_or_404
+import datetime
+import hashlib
+from django.db.models import Count, Sum
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.shortcuts import render
 from django.views import View
-from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import UserPassesTestMixin
-from accounts.permissions import is_owner_or_is_teacher
+from accounts.permissions import OwnerPermissionMixin, is_owner_or_is_teacher
 from tracker.models import Goal, Practice
 from tracker_calendar.utils import MyHTMLCalendar
+from tracker_calendar.cache import get_last_modified
 from django.utils.dateparse import parse_date
 
-UserModel = get_user_model()
+CALENDAR_DATA_MAX_DAYS = 366
 
-class YearView(UserPassesTestMixin, View):
+class YearView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, year):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         goals = Goal.objects.filter(user=owner)
-        practice = Practice.objects.filter(task__user=owner) if request.user == owner else Practice.objects.none()
-        c = MyHTMLCalendar(goals=goals, practice=practice)
+        show_practice = request.user == owner
+        practice = Practice.objects.filter(task__user=owner) if show_practice else Practice.objects.none()
+        c = MyHTMLCalendar(goals=goals, practice=practice, owner=owner, show_practice=show_practice)
         html_calendar = c.formatyear(year)
         return render(request, 'tracker_calendar/year_view.html', {'cal': html_calendar, 'owner': owner})
 
-class DayView(UserPassesTestMixin, View):
+class MonthView(OwnerPermissionMixin, View):
     def test_func(self):
-        return is_owner_or_is_teacher(self.request.user, self.kwargs['username'])
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get(self, request, username, year, month):
+        owner = self.owner
+        if not 1 <= month <= 12:
+            raise Http404("Page not found.")
+        goals = Goal.objects.filter(user=owner)
+        show_practice = request.user == owner
+        practice = Practice.objects.filter(task__user=owner) if show_practice else Practice.objects.none()
+        c = MyHTMLCalendar(goals=goals, practice=practice, owner=owner, show_practice=show_practice)
+        html_calendar = c.formatmonth(year, month)
+        return render(request, 'tracker_calendar/month_view.html', {
+            'cal': html_calendar,
+            'owner': owner,
+            'year': year,
+            'previous': c.prevmonth(year, month),
+            'next': c.nextmonth(year, month)
+        })
+
+class WeekView(OwnerPermissionMixin, View):
+    def test_func(self):
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get(self, request, username, year, week):
+        owner = self.owner
+        try:
+            monday = datetime.date.fromisocalendar(year, week, 1)
+        except ValueError:
+            raise Http404("Page not found.")
+        goals = Goal.objects.filter(user=owner)
+        show_practice = request.user == owner
+        practice = Practice.objects.filter(task__user=owner) if show_practice else Practice.objects.none()
+        c = MyHTMLCalendar(goals=goals, practice=practice, owner=owner, show_practice=show_practice)
+        html_calendar = c.formatisoweek(year, week)
+        return render(request, 'tracker_calendar/week_view.html', {
+            'cal': html_calendar,
+            'owner': owner,
+            'year': year,
+            'previous': (monday - datetime.timedelta(weeks=1)).isocalendar()[:2],
+            'next': (monday + datetime.timedelta(weeks=1)).isocalendar()[:2]
+        })
+
+class DayView(OwnerPermissionMixin, View):
+    def test_func(self):
+        return self.has_permission(is_owner_or_is_teacher)
 
     def get(self, request, username, year, month, day):
-        owner = get_object_or_404(UserModel, username=username)
+        owner = self.owner
         date = parse_date("%s.%s.%s" % (day, month, year))
         goal_list = Goal.objects.filter(user=owner).filter(date=date)
         if request.user == owner:
-            practice_list = Practice.objects.filter(task__user=owner).filter(date=date)
+            practice_list = Practice.objects.filter(task__user=owner).filter(date=date).for_display()
         else:
             practice_list = Practice.objects.none()
         return render(
@@ -43,3 +94,56 @@ class DayView(UserPassesTestMixin, View):
                 'owner': owner
             })
 
+class CalendarDataView(OwnerPermissionMixin, View):
+    """
+    Per-day goals and practice summaries between start and end dates as JSON.
+    Responses carry ETag and Last-Modified of owner's calendar, so unchanged data is answered with 304.
+    """
+    def test_func(self):
+        return self.has_permission(is_owner_or_is_teacher)
+
+    def get(self, request, username):
+        owner = self.owner
+        year = timezone.localdate().year
+        try:
+            start = parse_date(request.GET.get('start', f'{year}-01-01'))
+            end = parse_date(request.GET.get('end', f'{year}-12-31'))
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            return HttpResponseBadRequest("Niepoprawna data.")
+        if end < start or (end - start).days >= CALENDAR_DATA_MAX_DAYS:
+            return HttpResponseBadRequest(f"Zakres dat może mieć od 1 do {CALENDAR_DATA_MAX_DAYS} dni.")
+        show_practice = request.user == owner
+        last_modified = get_last_modified(owner.pk)
+        etag = quote_etag(hashlib.md5(
+            f"{owner.pk}:{start}:{end}:{show_practice}:{last_modified}".encode(), usedforsecurity=False
+        ).hexdigest())
+        response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+        if response is None:
+            response = JsonResponse({'start': start, 'end': end, 'days': self.get_days(owner, start, end, show_practice)})
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_days(self, owner, start, end, show_practice):
+        days = {}
+        goals = Goal.objects.filter(user=owner, date__range=(start, end)).order_by('date', 'pk').values_list('date', 'name')
+        for date, name in goals:
+            day = days.setdefault(date.isoformat(), {'goals': []})
+            day['goals'].append(name)
+        if show_practice:
+            practices = Practice.objects.filter(task__user=owner, date__range=(start, end)).values('date').annotate(
+                count=Count('pk'),
+                repetitions=Sum('repetitions'),
+                time=Sum('time'),
+            ).order_by('date')
+            for practice in practices:
+                day = days.setdefault(practice['date'].isoformat(), {'goals': []})
+                day['practices'] = {
+                    'count': practice['count'],
+                    'repetitions': float(practice['repetitions'] or 0),
+                    'minutes': int(practice['time'].total_seconds() // 60) if practice['time'] else 0,
+                }
+        return dict(sorted(days.items()))